@@ -1,5 +1,8 @@
-from flask import Flask, render_template, request, send_file
+from flask import Flask, Response, render_template, request, send_file
 from scraper_final import AdvancedHotelScraper
+from job_queue import JobQueue, QueueFull
+from result_sinks import CsvSink, ListSink, MultiSink, UniqueSink
+import metrics
 import os
 from datetime import datetime
 
@@ -7,6 +10,46 @@ app = Flask(__name__)
 DOWNLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'downloads')
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 
+def run_scrape_job(city, country, motel_type):
+    """Scrape pipeline executed on a job queue worker"""
+    scraper = AdvancedHotelScraper(use_selenium=True)
+
+    filename = f"hotels_{city}_{country}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    filename = filename.replace(' ', '_')
+    file_path = os.path.join(DOWNLOAD_FOLDER, filename)
+
+    try:
+        # Rows land in the CSV as each hotel finishes, a crashed job keeps what it had. The merge
+        # below works from what was streamed, a source that timed out returns nothing but wrote its rows
+        streamed = ListSink()
+        with UniqueSink(MultiSink([CsvSink(file_path), streamed])) as sink:
+            scraper.scrape_all_sources(city, country, sink=sink, collect=False)
+
+        # Then the file is replaced by one with the same hotel from both sources merged (fuzzy names, phones)
+        hotels = scraper.remove_duplicates(streamed.hotels)
+        with CsvSink(file_path + '.tmp') as merged:
+            for hotel in hotels:
+                merged.write(hotel)
+        os.replace(file_path + '.tmp', file_path)
+
+        return {"filename": filename, "hotels": len(hotels), "sources": scraper.source_stats,
+                "cache": scraper.page_cache.stats() if scraper.page_cache else None,
+                "store": scraper.hotel_store.stats() if scraper.hotel_store else None,
+                "lookups": scraper.lookup_cache.stats() if scraper.lookup_cache else None,
+                "selectors": scraper.selector_planner.report(),
+                "rate_limits": scraper.rate_limiter.rates() if scraper.rate_limiter else None,
+                "page_loads": scraper.load_stats}
+
+    finally:
+        scraper.cleanup()
+
+jobs = JobQueue(
+    run_scrape_job,
+    workers=int(os.environ.get('SCRAPE_WORKERS', 2)),
+    max_queued=int(os.environ.get('SCRAPE_QUEUE_DEPTH', 10))
+)
+metrics.Gauge('scraper_jobs_queued', 'Scrape jobs waiting for a worker', function=lambda: jobs.stats()['queued'])
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -17,22 +60,37 @@ def scrape():
     country = request.form['country']
     motel_type = request.form['type']
 
-    scraper = AdvancedHotelScraper(use_selenium=True)
-    scraper.load_proxies()
-
     try:
-        hotels = scraper.scrape_all_sources(city, country)
-        hotels = scraper.remove_duplicates(hotels)
+        job = jobs.submit(city=city, country=country, motel_type=motel_type)
+    except QueueFull as e:
+        return {"status": "error", "message": str(e)}, 503
 
-        filename = f"hotels_{city}_{country}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        filename = filename.replace(' ', '_')
-        file_path = os.path.join(DOWNLOAD_FOLDER, filename)
-        scraper.save_to_csv(hotels, file_path)
+    return {"status": "queued", "job_id": job.id, "message": f"Scraping {city}, {country} queued"}, 202
 
-        return {"status": "success", "message": f"Scraping done! File saved as {filename}"}
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return {"status": "error", "message": "Unknown job"}, 404
+    return job.to_dict()
 
-    finally:
-        scraper.cleanup()
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return {"status": "error", "message": "Unknown job"}, 404
+    if not job.done:
+        return {"status": job.status, "message": "Job has not finished yet"}, 409
+    if job.status == 'failed':
+        return {"status": "failed", "message": job.error}, 500
+    if not job.result["hotels"]:
+        return {"status": "finished", "message": "No hotels found"}, 404
+
+    return send_file(os.path.join(DOWNLOAD_FOLDER, job.result["filename"]), as_attachment=True)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True)
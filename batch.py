@@ -0,0 +1,171 @@
+"""Scrape a list of cities without prompts, sharded across worker processes.
+
+Usage: python batch.py CITIES [--workers N] [--out-dir DIR] [--format csv|ndjson|parquet]
+                      [--min-rating R] [--max-results N] [--no-selenium] [--resume]
+
+CITIES is a CSV with city and country columns (a header row is optional)
+or NDJSON with one {"city": ..., "country": ...} object per line. Every
+worker process runs its own scraper and Chrome pool over its share of the
+cities, sources in parallel per city, and writes to its own file in the
+output directory (shard-00.csv, shard-01.csv, ...).
+
+Next to each file a journal (shard-00.journal) records every finished
+search page, hotel and city. After a crash, rerun with the same list,
+worker count and --resume: finished work comes from the journals and
+only the rest is scraped.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+from journal import Journal
+from result_sinks import UniqueSink, open_sink
+
+
+def read_cities(path):
+    """(city, country) pairs in file order, without repeats"""
+    pairs = []
+    with open(path, encoding='utf-8', newline='') as f:
+        if os.path.splitext(path)[1].lower() in ('.ndjson', '.jsonl'):
+            rows = ((row.get('city'), row.get('country')) for row in map(json.loads, filter(str.strip, f)))
+        else:
+            rows = (tuple(row[:2]) for row in csv.reader(f) if len(row) >= 2)
+        for city, country in rows:
+            city, country = (city or '').strip(), (country or '').strip()
+            if not city or (city.lower(), country.lower()) == ('city', 'country'):
+                continue  # blank line or header row
+            pairs.append((city, country))
+    return list(dict.fromkeys(pairs))
+
+
+def shard(items, count):
+    """Round-robin split, so shards get a similar mix of large and small cities"""
+    return [items[i::count] for i in range(count) if items[i::count]]
+
+
+def run_shard(index, cities, out_path, scraper_options, min_rating=None, resume=False):
+    """Scrape cities one after another into out_path, returns the shard's totals"""
+    # Imported here so every worker process builds its own scraper, caches and Chrome pool
+    from scraper_final import AdvancedHotelScraper
+
+    journal = Journal(os.path.splitext(out_path)[0] + '.journal', resume=resume)
+    scraper = AdvancedHotelScraper(journal=journal, **scraper_options)
+    totals = {'shard': index, 'path': out_path, 'cities': 0, 'hotels': 0, 'resumed': 0, 'failed': [],
+              'source_failures': 0}
+    started = time.time()
+    try:
+        # One row per hotel and city, a chain's branches in other cities are kept
+        key = lambda hotel: ((hotel.get('name') or '').lower().strip(), (hotel.get('city') or '').lower())
+        with UniqueSink(open_sink(out_path), key=key) as sink:
+            for city, country in cities:
+                before = sink.count
+                try:
+                    scraper.scrape_all_sources(city, country, min_rating, sink=sink, collect=False)
+                    statuses = [stats['status'] for stats in scraper.source_stats.values()]
+                except Exception as e:
+                    print(f"[shard {index}] {city}, {country} failed: {e}")
+                    statuses = []
+                totals['source_failures'] += sum(status not in ('ok', 'resumed', 'skipped') for status in statuses)
+                totals['resumed'] += 'resumed' in statuses
+                # No source got through, or every one of them came back empty
+                if ('ok' not in statuses and 'resumed' not in statuses) or sink.count == before:
+                    totals['failed'].append(f"{city}, {country}")
+                totals['cities'] += 1
+                print(f"[shard {index}] {city}, {country}: {sink.count - before} hotels "
+                      f"({totals['cities']}/{len(cities)})")
+            totals['hotels'] = sink.count
+    finally:
+        scraper.cleanup(shutdown_pool=True)
+        journal.close()
+    totals['seconds'] = round(time.time() - started, 1)
+    return totals
+
+
+def shard_main(conn, *args):
+    """Worker process entry point, sends run_shard's totals back over conn"""
+    try:
+        conn.send(run_shard(*args))
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('cities', help='CSV or NDJSON file of city/country pairs')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='worker processes')
+    parser.add_argument('--out-dir', default='batch_output', help='directory for the per-shard files')
+    parser.add_argument('--format', default='csv', choices=['csv', 'ndjson', 'parquet'])
+    parser.add_argument('--min-rating', type=float, default=None,
+                        help='Booking.com review score (1-10), halved for Google Maps stars')
+    parser.add_argument('--max-results', type=int, default=None, help='properties per source and city')
+    parser.add_argument('--no-selenium', action='store_true', help='requests only (no Chrome, no Google Maps)')
+    parser.add_argument('--resume', action='store_true', help='skip work recorded in the shard journals')
+    args = parser.parse_args()
+
+    cities = read_cities(args.cities)
+    if not cities:
+        parser.error(f"no cities in {args.cities}")
+    shards = shard(cities, max(1, args.workers))
+    os.makedirs(args.out_dir, exist_ok=True)
+    options = {'use_selenium': not args.no_selenium, 'max_results': args.max_results}
+    print(f"Scraping {len(cities)} cities in {len(shards)} shards into {args.out_dir}/")
+
+    started = time.time()
+    # One process per shard rather than a pool: a worker killed by the OOM killer (or taken down
+    # by Chrome) breaks a process pool for every shard, here it only fails its own cities
+    processes = {}
+    receivers = {}
+    for i, part in enumerate(shards):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        out_path = os.path.join(args.out_dir, f"shard-{i:02d}.{args.format}")
+        process = multiprocessing.Process(target=shard_main, name=f"shard-{i:02d}",
+                                          args=(sender, i, part, out_path, options, args.min_rating, args.resume))
+        process.start()
+        sender.close()
+        processes[process.sentinel] = (i, process)
+        receivers[receiver] = i
+
+    # Totals are read as soon as they arrive (a large one would block the sender otherwise),
+    # a shard whose process exits without having sent any crashed
+    totals = {}
+    results = []
+    while processes:
+        ready = wait(list(receivers) + list(processes))
+        for receiver in [conn for conn in ready if conn in receivers]:
+            index = receivers.pop(receiver)
+            try:
+                totals[index] = receiver.recv()
+            except EOFError:
+                pass  # died before sending its totals
+            receiver.close()
+        for sentinel in [conn for conn in ready if conn in processes]:
+            index, process = processes.pop(sentinel)
+            process.join()
+            result = totals.get(index)
+            if result is None:
+                # The worker process died (Chrome took it down, out of memory), its cities count as failed
+                print(f"Shard {index} crashed with exit code {process.exitcode}")
+                result = {'shard': index, 'cities': len(shards[index]), 'hotels': 0, 'resumed': 0, 'source_failures': 0,
+                          'failed': [f"{city}, {country}" for city, country in shards[index]], 'seconds': None}
+            results.append(result)
+            print(f"Shard {result['shard']} done: {result['cities']} cities, {result['hotels']} hotels, "
+                  f"{len(result['failed'])} failed")
+
+    minutes = (time.time() - started) / 60
+    cities_done = sum(result['cities'] for result in results)
+    hotels = sum(result['hotels'] for result in results)
+    failed = [city for result in sorted(results, key=lambda r: r['shard']) for city in result['failed']]
+    print(f"\n{cities_done} cities, {hotels} hotels in {minutes:.1f} min: "
+          f"{cities_done / minutes:.1f} cities/min, {hotels / minutes:.1f} hotels/min")
+    print(f"{len(failed)} cities failed, {sum(result['source_failures'] for result in results)} source failures, "
+          f"{sum(result['resumed'] for result in results)} cities taken from journals")
+    for city in failed:
+        print(f"  failed: {city}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Compare the single-pass contact scanner with the old regex cascade.
+
+Usage: python benchmarks/bench_contacts.py [--pages DIR] [--repeat N] [--processes N]
+
+Pages are scanned as raw HTML, the way get_phone_from_official_site hands
+them over. Without saved pages a set of large synthetic pages is used.
+"""
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_scanner import best_phone, scan_many  # noqa: E402
+
+LEGACY_PATTERNS = [
+    r'\+?[\d\s\-\(\)]{10,20}',
+    r'\(\d{3}\)\s?\d{3}-\d{4}',
+    r'\d{3}-\d{3}-\d{4}',
+    r'\d{10,}',
+]
+
+
+def legacy_extract_phone_number(text):
+    """extract_phone_number as it was before contact_scanner"""
+    if not text:
+        return None
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, text)
+        if match:
+            return match.group().strip()
+    return None
+
+
+def synthetic_pages(count, size_kb, seed=0):
+    """Hotel-like pages of roughly size_kb each, with one phone number near the end"""
+    rng = random.Random(seed)
+    words = ['room', 'suite', 'breakfast', 'pool', 'spa', 'parking', 'wifi', 'city', 'view', 'rate']
+    pages = []
+    for i in range(count):
+        parts = []
+        while sum(len(part) for part in parts) < size_kb * 1024:
+            sentence = ' '.join(rng.choice(words) for _ in range(12))
+            parts.append(f'<div class="c{rng.randint(0, 999)}" data-id="{rng.randint(0, 10**6)}"><p>{sentence}</p></div>\n')
+        parts.append(f'<footer>Phone: +1 (555) {100 + i % 900:03d}-{i % 10000:04d}</footer>')
+        pages.append(''.join(parts))
+    return pages
+
+
+def timed(fn, pages, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(pages)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    default_pages = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', default=default_pages, help='directory of saved .html pages')
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the page set per method')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='workers for the batch run')
+    parser.add_argument('--synthetic', type=int, default=50, help='synthetic pages when DIR has none')
+    parser.add_argument('--size-kb', type=int, default=500, help='size of each synthetic page')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages, '**', '*.html'), recursive=True))
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+    if not pages:
+        pages = synthetic_pages(args.synthetic, args.size_kb)
+
+    total_mb = sum(len(page) for page in pages) / (1024 * 1024)
+    print(f"{len(pages)} pages ({total_mb:.1f} MB), {args.repeat} passes\n")
+    print(f"{'method':<28} {'MB/sec':>8} {'ms/page':>9} {'found':>6}")
+
+    methods = [
+        ('extract_phone_number (old)', lambda batch: [legacy_extract_phone_number(page) for page in batch]),
+        ('best_phone', lambda batch: [best_phone(page) for page in batch]),
+        (f'scan_many ({args.processes} procs)', lambda batch: scan_many(batch, processes=args.processes)),
+    ]
+    baseline = None
+    for name, fn in methods:
+        found = sum(1 for result in fn(pages) if result)
+        elapsed = timed(fn, pages, args.repeat)
+        rate = total_mb / elapsed
+        baseline = baseline or rate
+        print(f"{name:<28} {rate:>8.1f} {1000 * elapsed / len(pages):>9.2f} {found:>6}  ({rate / baseline:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
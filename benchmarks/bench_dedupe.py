@@ -0,0 +1,130 @@
+"""Duplicate detection throughput and quality on a large synthetic multi-city batch.
+
+Usage: python benchmarks/bench_dedupe.py [--records N] [--cities N] [--dup-rate R]
+
+Records imitate Booking.com and Google Maps rows for the same hotels:
+chain names, suffixes like "/Convention Center", reordered case and
+punctuation, phone numbers in different formats. Pairwise precision and
+recall are measured against the generator's ground truth, and a few
+hand-picked name pairs with no phone or website must resolve as listed.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedupe import DuplicateResolver  # noqa: E402
+
+CHAINS = ['Hilton', 'Hilton Garden Inn', 'Marriott', 'Courtyard by Marriott', 'Holiday Inn Express',
+          'Hyatt Place', 'Best Western Plus', 'Comfort Inn', 'Hampton Inn', 'Motel 6', 'Super 8', 'Days Inn']
+AREAS = ['Downtown', 'Airport', 'North', 'South', 'East', 'West', 'Riverside', 'Central', 'Old Town',
+         'University', 'Harbour', 'Convention Center', 'Midtown', 'Station', 'Beach', 'Park']
+INDEPENDENT = ['Grand', 'Royal', 'Palace', 'Garden', 'Plaza', 'Boutique', 'Heritage', 'Lotus', 'Maple',
+               'Oak', 'Sunset', 'Harbor', 'Crown', 'Imperial', 'Bluebird', 'Willow', 'Cedar', 'Aurora']
+SUFFIXES = ['/Convention Center', ' & Suites', ' - an IHG Hotel', ' Hotel', ', Trademark Collection']
+
+# Name pairs in one city, with nothing else to go on, and whether they are the same hotel
+KNOWN_PAIRS = [
+    ('Hilton Garden Inn Austin Downtown', 'Hilton Garden Inn Austin Downtown/Convention Center', True),
+    ('Hilton Garden Inn Downtown', 'Hilton Garden Inn Downtown & Suites', True),
+    ('Holiday Inn Express Austin North', 'Holiday Inn Express Austin South', False),
+    ('Hilton Garden Inn Austin', 'Hilton Garden Inn Austin North', False),
+]
+
+
+def make_hotel(rng, city, n):
+    if rng.random() < 0.6:
+        name = f"{rng.choice(CHAINS)} {city} {rng.choice(AREAS)}"
+        if rng.random() < 0.5:
+            name += f" {rng.choice(AREAS)}"
+    else:
+        name = f"The {rng.choice(INDEPENDENT)} {rng.choice(INDEPENDENT)} {rng.choice(INDEPENDENT)} {n}"
+    digits = f"{rng.randint(200, 999)}{rng.randint(200, 999)}{rng.randint(1000, 9999)}"
+    return name, digits
+
+
+def variant(rng, name, digits):
+    """The same hotel as another source would report it"""
+    if rng.random() < 0.5:
+        name += rng.choice(SUFFIXES)
+    if rng.random() < 0.3:
+        name = name.lower()
+    if rng.random() < 0.2:
+        name = name.replace('The ', '')
+    phone = f"+1 ({digits[:3]}) {digits[3:6]}-{digits[6:]}" if rng.random() < 0.7 else None
+    return name, phone
+
+
+def generate(records, cities, dup_rate, seed=0):
+    rng = random.Random(seed)
+    city_names = [f"City{i}" for i in range(cities)]
+    hotels = []
+    entity = 0
+    while len(hotels) < records:
+        city = rng.choice(city_names)
+        name, digits = make_hotel(rng, city, entity)
+        hotels.append({'name': name, 'city': city, 'country': 'US', 'source': 'Booking.com',
+                       'phone': f"{digits[:3]}-{digits[3:6]}-{digits[6:]}", 'entity': entity})
+        if rng.random() < dup_rate:
+            dup_name, phone = variant(rng, name, digits)
+            hotels.append({'name': dup_name, 'city': city.upper() if rng.random() < 0.2 else city,
+                           'country': 'US', 'source': 'Google Maps', 'contact': phone, 'entity': entity})
+        entity += 1
+    rng.shuffle(hotels)
+    return hotels[:records]
+
+
+def check_known_pairs(resolver):
+    """KNOWN_PAIRS the resolver gets wrong"""
+    wrong = []
+    for left, right, same in KNOWN_PAIRS:
+        hotels = [{'name': name, 'city': 'Austin', 'country': 'US'} for name in (left, right)]
+        if (len(resolver.groups(hotels)) == 1) != same:
+            wrong.append(f"{left!r} / {right!r} should {'' if same else 'not '}merge")
+    return wrong
+
+
+def pairs(sizes):
+    return sum(size * (size - 1) // 2 for size in sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=100_000, help='records in the batch')
+    parser.add_argument('--cities', type=int, default=200, help='distinct cities')
+    parser.add_argument('--dup-rate', type=float, default=0.4, help='share of hotels seen by a second source')
+    args = parser.parse_args()
+
+    hotels = generate(args.records, args.cities, args.dup_rate)
+    resolver = DuplicateResolver()
+
+    started = time.perf_counter()
+    groups = resolver.groups(hotels)
+    elapsed = time.perf_counter() - started
+
+    # Pairwise quality: true positive pairs are same-entity pairs inside one predicted group
+    true_pairs = pairs(Counter(hotel['entity'] for hotel in hotels).values())
+    found_pairs = pairs(len(group) for group in groups)
+    correct_pairs = sum(pairs(Counter(hotels[i]['entity'] for i in group).values()) for group in groups)
+
+    stats = resolver.stats
+    all_pairs = len(hotels) * (len(hotels) - 1) // 2
+    print(f"{stats['records']} records, {args.cities} cities -> {stats['unique']} hotels in {elapsed:.2f}s "
+          f"({stats['records'] / elapsed:,.0f} records/sec)")
+    print(f"{stats['blocks']} blocks, {stats['comparisons']:,} comparisons "
+          f"({stats['comparisons'] / stats['records']:.1f} per record, all-pairs would be {all_pairs:,})")
+    print(f"precision {correct_pairs / found_pairs if found_pairs else 1.0:.3f}, "
+          f"recall {correct_pairs / true_pairs if true_pairs else 1.0:.3f}")
+
+    wrong = check_known_pairs(DuplicateResolver())
+    print(f"known pairs {len(KNOWN_PAIRS) - len(wrong)}/{len(KNOWN_PAIRS)}")
+    if wrong:
+        sys.exit('\n'.join(wrong))
+
+
+if __name__ == '__main__':
+    main()
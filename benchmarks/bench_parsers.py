@@ -0,0 +1,93 @@
+"""Compare HTML parser backends on saved pages.
+
+Usage: python benchmarks/bench_parsers.py [--pages DIR] [--repeat N]
+
+Every page is parsed and queried with the selectors the scraper uses for
+Booking.com search results, hotel detail pages and Google SERPs, so the
+numbers reflect parse + select cost per page.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_parser import BACKENDS, LXML_AVAILABLE, SELECTOLAX_AVAILABLE, parse_html  # noqa: E402
+
+CARD_SELECTORS = ['div[data-testid="property-card"]', '.sr_item', '[data-testid="property-card"]', '.sr_item_content']
+CARD_FIELD_SELECTORS = [
+    '[data-testid="title"]', '.sr-hotel__name', 'h3 a', '.fcab3ed991.a23c043802',
+    '[data-testid="review-score"] div', '.bui-review-score__badge', '.review-score-badge',
+    '[data-testid="price-and-discounted-price"]', '.bui-price-display__value', '.prco-valign-middle-helper',
+    'a[href]'
+]
+PAGE_SELECTORS = [
+    '[data-testid="phone-number"]', '.phone-number', '.hotel-phone', '.contact-phone',
+    '[data-testid="website"]', '.hotel-website', '.official-website', 'a[href*="hotel"]',
+    "a[jsname='UWckNb']", 'div.yuRUbf a[href]'
+]
+
+
+def workload(html, backend):
+    """Parse one page and run the scraper's selectors over it, returns cards seen"""
+    soup = parse_html(html, backend)
+    cards = []
+    for selector in CARD_SELECTORS:
+        cards = soup.select(selector)
+        if cards:
+            break
+    for card in cards:
+        for selector in CARD_FIELD_SELECTORS:
+            elem = card.select_one(selector)
+            if elem:
+                elem.get_text(strip=True)
+    for selector in PAGE_SELECTORS:
+        soup.select_one(selector)
+    for a in soup.select('a[href]'):
+        a.get('href', '')
+    soup.get_text()
+    return len(cards)
+
+
+def main():
+    default_pages = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', default=default_pages, help='directory of saved .html pages')
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the page set per backend')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages, '**', '*.html'), recursive=True))
+    if not paths:
+        sys.exit(f"No .html pages found in {args.pages}, save some pages there first")
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+
+    available = {'html.parser': True, 'lxml': LXML_AVAILABLE, 'selectolax': SELECTOLAX_AVAILABLE}
+    total_kb = sum(len(page) for page in pages) / 1024
+    print(f"{len(pages)} pages ({total_kb:.0f} KB), {args.repeat} passes\n")
+    print(f"{'backend':<12} {'pages/sec':>10} {'ms/page':>9} {'cards':>7}")
+
+    baseline = None
+    for backend in BACKENDS:
+        if not available[backend]:
+            print(f"{backend:<12} {'not installed':>10}")
+            continue
+
+        started = time.perf_counter()
+        cards = 0
+        for _ in range(args.repeat):
+            for html in pages:
+                cards += workload(html, backend)
+        elapsed = time.perf_counter() - started
+
+        rate = len(pages) * args.repeat / elapsed
+        baseline = baseline or rate
+        print(f"{backend:<12} {rate:>10.1f} {1000 / rate:>9.2f} {cards // args.repeat:>7}  ({rate / baseline:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""Offline throughput of the scraper's parsing hot path on the checked-in fixtures.
+
+Usage: python benchmarks/bench_suite.py [--repeat N] [--parser BACKEND] [--save-baseline] [--tolerance F]
+
+Each workload runs the real scraper methods with page loads answered from
+benchmarks/fixtures, so no network or Chrome is needed. Results are
+compared with benchmarks/baseline.json, a drop in pages/sec beyond the
+tolerance exits non-zero. Baselines are machine specific, save one on the
+machine you compare on.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from contact_scanner import best_phone  # noqa: E402
+from scraper_final import AdvancedHotelScraper  # noqa: E402
+from selector_planner import SelectorPlanner  # noqa: E402
+
+FIXTURES = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Methods whose inclusive time is reported per workload (summed over enrichment threads)
+PROFILED = ['scrape_booking_com', 'parse_booking_card', 'get_hotel_details', 'get_phone_from_official_site',
+            'extract_phone_number', 'parse_html']
+
+
+def load(category):
+    pages = {}
+    for name in sorted(os.listdir(os.path.join(FIXTURES, category))):
+        with open(os.path.join(FIXTURES, category, name), encoding='utf-8') as f:
+            pages[name] = f.read()
+    return pages
+
+
+class FixtureScraper(AdvancedHotelScraper):
+    """Scraper whose page loads are answered from fixtures, with per-method timers"""
+
+    def __init__(self, parser_backend=None):
+        # A private planner, the global one would save its stats into the working directory
+        super().__init__(use_selenium=False, use_cache=False, use_store=False,
+                         use_proxies=False, rate_limit=False, use_lookup_cache=False,
+                         parser_backend=parser_backend, selector_planner=SelectorPlanner())
+        self.routes = []
+        self.page_loads = 0
+        self.timings = defaultdict(float)
+        self.calls = defaultdict(int)
+        self._timings_lock = threading.Lock()
+        for name in PROFILED:
+            setattr(self, name, self._timed(name, getattr(self, name)))
+
+    def _timed(self, name, method):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                with self._timings_lock:
+                    self.timings[name] += time.perf_counter() - started
+                    self.calls[name] += 1
+        return wrapper
+
+    def route(self, url):
+        with self._timings_lock:
+            self.page_loads += 1
+        for fragment, html in self.routes:
+            if fragment in url:
+                return html
+        return None
+
+    def get_page_requests(self, url, retries=5, bypass_cache=False):
+        return self.route(url)
+
+    def get_page_selenium(self, url, wait_time=10, bypass_cache=False):
+        return self.route(url)
+
+
+def booking_search(scraper, search_html, detail_html):
+    """Search pages plus every card's detail page, like scrape_booking_com does live"""
+    # Every offset answers with the same page, so the second page has nothing new and ends the search
+    scraper.routes = [('searchresults', search_html), ('/hotel/', detail_html)]
+    loads = scraper.page_loads
+    hotels = scraper.scrape_booking_com('Austin', 'United States')
+    return scraper.page_loads - loads, len(hotels)
+
+
+def hotel_page(scraper, html):
+    scraper.routes = [('', html)]
+    scraper.get_hotel_details('https://www.booking.com/hotel/us/fixture.html', 'Booking.com')
+    return 1, 0
+
+
+def official_site(scraper, home_html, contact_html):
+    scraper.routes = [('contact', contact_html), ('', home_html)]
+    scraper.get_phone_from_official_site('https://www.example-hotel.com')
+    return 2, 0
+
+
+def maps_panel(scraper, html):
+    """What get_contact_from_google_knowledge_panel does with the rendered panel"""
+    soup = scraper.parse_html(html)
+    for elem in soup.select('.Io6YTe.fontBodyMedium.kR99db.fdkmkc'):
+        if scraper.extract_phone_number(elem.get_text()):
+            break
+    best_phone(soup.get_text(' '), kinds=('nanp',))
+    return 1, 0
+
+
+def workloads():
+    search, details = load('booking_search'), load('hotel_page')
+    official, panels = load('official_site'), load('google_maps_panel')
+    detail = details.get('with_contact.html') or next(iter(details.values()))
+    jobs = []
+    for name, html in search.items():
+        jobs.append((f"booking_search/{name}", booking_search, (html, detail)))
+    for name, html in details.items():
+        jobs.append((f"hotel_page/{name}", hotel_page, (html,)))
+    jobs.append(("official_site", official_site, (official['home.html'], official['contact.html'])))
+    for name, html in panels.items():
+        jobs.append((f"google_maps_panel/{name}", maps_panel, (html,)))
+    return jobs
+
+
+def run(name, fn, args, repeat, parser_backend):
+    scraper = FixtureScraper(parser_backend)
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(scraper, *args)  # warm up the selector planner and imports
+
+        tracemalloc.start()
+        fn(scraper, *args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        scraper.timings.clear()
+        scraper.calls.clear()
+        pages = cards = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            p, c = fn(scraper, *args)
+            pages += p
+            cards += c
+        elapsed = time.perf_counter() - started
+
+    return {
+        'pages_per_sec': round(pages / elapsed, 1),
+        'cards_per_sec': round(cards / elapsed, 1),
+        'peak_kb': round(peak / 1024),
+        'functions_ms': {fn_name: round(1000 * total / repeat, 3) for fn_name, total in sorted(scraper.timings.items())},
+        'calls_per_run': {fn_name: count // repeat for fn_name, count in sorted(scraper.calls.items())}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per workload')
+    parser.add_argument('--parser', default=None, help='HTML parser backend (default HTML_PARSER)')
+    parser.add_argument('--save-baseline', action='store_true', help=f'write results to {BASELINE}')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed pages/sec drop vs baseline')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE) and not args.save_baseline:
+        with open(BASELINE, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'workload':<40} {'pages/s':>9} {'cards/s':>9} {'peak KB':>8} {'vs base':>8}")
+    for name, fn, fn_args in workloads():
+        result = results[name] = run(name, fn, fn_args, args.repeat, args.parser)
+        change = ''
+        base = baseline.get(name)
+        if base:
+            ratio = result['pages_per_sec'] / base['pages_per_sec'] - 1
+            change = f"{ratio:+.0%}"
+            if ratio < -args.tolerance:
+                regressions.append(name)
+        print(f"{name:<40} {result['pages_per_sec']:>9.1f} {result['cards_per_sec']:>9.1f} "
+              f"{result['peak_kb']:>8} {change:>8}")
+        for fn_name, ms in result['functions_ms'].items():
+            print(f"    {fn_name:<36} {ms:>9.2f} ms/run ({result['calls_per_run'][fn_name]} calls)")
+
+    if args.save_baseline:
+        with open(BASELINE, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline saved to {BASELINE}")
+    elif regressions:
+        sys.exit(f"\nRegressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# One pass over the text finds every digit run that could be a phone number,
+# the format checks below only ever look at the (short) candidate itself.
+# Same as (?<![\w+])\+?\(?\d..., but starting with a character class lets re
+# skip ahead to the next +, ( or digit instead of testing the lookbehind everywhere
+_CANDIDATE_RE = re.compile(r'[+(\d](?<![\w+].)(?:(?<=\+)\(?\d|(?<=\()\d|(?<=\d))[\d \t\u00a0\-.()]{6,22}\d(?!\w)')
+_NANP_RE = re.compile(r'(?:\+?1[ \u00a0\-.]?)?(?:\(\d{3}\)[ \u00a0]?|\d{3}[ \u00a0\-.])\d{3}[ \u00a0\-.]\d{4}')
+_INTERNATIONAL_RE = re.compile(r'\+\d{1,3}[ \u00a0\-.]?(?:\(\d{1,4}\)[ \u00a0\-.]?)?\d[\d \u00a0\-.]*\d')
+_CONTEXT_RE = re.compile(r'(?:tel:|phone|call|contact|reservations?)\W*$', re.IGNORECASE)
+_DATE_RE = re.compile(r'(?:19|20)\d{2}[\-./]\d{1,2}[\-./]\d{1,2}$|\d{1,2}[\-./]\d{1,2}[\-./](?:19|20)\d{2}$')
+
+# Base confidence per kind, context words like "Phone:" or a tel: link add CONTEXT_BONUS
+CONFIDENCE = {'nanp': 0.9, 'international': 0.85, 'formatted': 0.6, 'digits': 0.4}
+CONTEXT_BONUS = 0.1
+CONTEXT_WINDOW = 24
+
+PhoneCandidate = namedtuple('PhoneCandidate', 'number start end kind confidence')
+
+
+def classify(number):
+    """Kind of a candidate number (nanp, international, formatted, digits) or None if it is not a phone"""
+    if number.isdigit():
+        # Most candidates in HTML are bare ids, none of the separated formats can match them
+        return 'digits' if 10 <= len(number) <= 15 else None
+    digits = sum(ch.isdigit() for ch in number)
+    if digits < 8 or digits > 15 or _DATE_RE.match(number):
+        return None
+    if _NANP_RE.fullmatch(number):
+        return 'nanp'
+    if number.startswith('+') and _INTERNATIONAL_RE.fullmatch(number):
+        return 'international'
+    return 'formatted' if digits >= 10 else None
+
+
+def scan_phones(text):
+    """All phone candidates in text, in order of appearance"""
+    if not text:
+        return []
+
+    candidates = []
+    for match in _CANDIDATE_RE.finditer(text):
+        number = match.group()
+        # Unbalanced parens come from the surrounding text, not the number
+        if number.count('(') != number.count(')'):
+            number = number.lstrip('(') if number.startswith('(') else number.rstrip(')')
+        kind = classify(number)
+        if not kind:
+            continue
+
+        start = match.start()
+        confidence = CONFIDENCE[kind]
+        if _CONTEXT_RE.search(text, max(0, start - CONTEXT_WINDOW), start):
+            confidence = min(1.0, confidence + CONTEXT_BONUS)
+        candidates.append(PhoneCandidate(number, start, match.end(), kind, round(confidence, 2)))
+    return candidates
+
+
+def best_phone(text, kinds=None, min_confidence=0.0):
+    """Most likely phone number in text (earliest wins a tie), or None"""
+    best = None
+    for candidate in scan_phones(text):
+        if kinds and candidate.kind not in kinds:
+            continue
+        if candidate.confidence < min_confidence:
+            continue
+        if best is None or candidate.confidence > best.confidence:
+            best = candidate
+    return best.number if best else None
+
+
+def scan_many(texts, processes=None, chunksize=8):
+    """scan_phones over many documents, optionally spread across worker processes"""
+    texts = list(texts)
+    if not processes or len(texts) < 2:
+        return [scan_phones(text) for text in texts]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(scan_phones, texts, chunksize=chunksize))
@@ -0,0 +1,204 @@
+import re
+from difflib import SequenceMatcher
+from urllib.parse import urlsplit
+
+from hotel_store import normalize_key
+
+# Words that say nothing about which hotel a name refers to
+STOPWORDS = frozenset({'the', 'a', 'an', 'and', 'by', 'at', 'of', 'on', 'in', 'hotel', 'hotels'})
+
+# Words that tell branches of a chain apart within a city ("... North", "... Airport")
+LOCATION_WORDS = frozenset({
+    'north', 'south', 'east', 'west', 'northeast', 'northwest', 'southeast', 'southwest', 'downtown',
+    'midtown', 'uptown', 'central', 'center', 'centre', 'airport', 'convention', 'station', 'university',
+    'riverside', 'waterfront', 'lakeside', 'beach', 'harbour', 'harbor', 'marina', 'old', 'town', 'park',
+    'mall', 'medical', 'stadium'
+})
+
+# Hosts that show up in the website field but do not identify a hotel
+SHARED_HOSTS = ('booking.com', 'hotels.com', 'expedia.com', 'google.com', 'tripadvisor.com', 'agoda.com',
+                'trivago.com', 'kayak.com', 'priceline.com', 'orbitz.com', 'yelp.com', 'facebook.com')
+
+
+# Records are only scored against others in the same block (same city plus a phone
+# number, website domain or first two name words), oversized blocks fall back to a
+# sorted-neighbourhood window, and union-find joins matches found through different blocks
+class DuplicateResolver:
+    """Merges records of the same hotel across sources without comparing all pairs"""
+
+    def __init__(self, threshold=0.85, phone_threshold=0.5, domain_threshold=0.7,
+                 window=8, max_block=40):
+        self.threshold = threshold
+        self.phone_threshold = phone_threshold
+        self.domain_threshold = domain_threshold
+        self.window = window
+        self.max_block = max_block
+        self.stats = {}
+
+    def resolve(self, hotels):
+        """Hotels with duplicates merged into their first occurrence, in input order"""
+        merged = [self._merge([hotels[i] for i in group]) for group in self.groups(hotels)]
+        self.stats['unique'] = len(merged)
+        return merged
+
+    def groups(self, hotels):
+        """Lists of indexes into hotels that refer to the same hotel, ordered by first index"""
+        records = [self._features(hotel) for hotel in hotels]
+        parent = list(range(len(records)))
+        # Phone numbers per group, two groups with different numbers are two hotels even if
+        # their names match (or a record without a phone matches both)
+        phones = [{record['phone']} if record['phone'] else set() for record in records]
+        # Location words per group, likewise a generic "Holiday Inn Express" may join one
+        # branch but must not chain "... North" and "... South" together
+        places = [set(record['places']) for record in records]
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        blocks = {}
+        for i, record in enumerate(records):
+            for key in record['blocks']:
+                blocks.setdefault(key, []).append(i)
+
+        compared = set()
+        matches = 0
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            for i, j in self._candidate_pairs(members, records):
+                pair = (i, j) if i < j else (j, i)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    continue
+                if phones[root_i] and phones[root_j] and phones[root_i].isdisjoint(phones[root_j]):
+                    continue
+                if not (places[root_i] <= places[root_j] or places[root_j] <= places[root_i]):
+                    continue
+                if self._is_match(records[i], records[j]):
+                    root, child = min(root_i, root_j), max(root_i, root_j)
+                    parent[child] = root
+                    phones[root] |= phones[child]
+                    phones[child] = set()
+                    places[root] |= places[child]
+                    places[child] = set()
+                    matches += 1
+
+        groups = {}
+        for i in range(len(records)):
+            groups.setdefault(find(i), []).append(i)
+
+        self.stats = {
+            'records': len(records),
+            'unique': len(groups),
+            'blocks': len(blocks),
+            'comparisons': len(compared),
+            'matches': matches
+        }
+        return [members for root, members in sorted(groups.items())]
+
+    def _candidate_pairs(self, members, records):
+        if len(members) <= self.max_block:
+            for a in range(len(members)):
+                for b in range(a + 1, len(members)):
+                    yield members[a], members[b]
+            return
+
+        # Sorted neighbourhood keeps oversized blocks (chain names, shared call centres) linear
+        ordered = sorted(members, key=lambda i: records[i]['name'])
+        for a in range(len(ordered)):
+            for b in range(a + 1, min(a + 1 + self.window, len(ordered))):
+                yield ordered[a], ordered[b]
+
+    def _is_match(self, left, right):
+        score = name_similarity(left, right)
+        if score >= self.threshold:
+            return True
+        if left['phone'] and left['phone'] == right['phone'] and score >= self.phone_threshold:
+            return True
+        if left['domain'] and left['domain'] == right['domain'] and score >= self.domain_threshold:
+            return True
+        return False
+
+    def _features(self, hotel):
+        city = normalize_key(hotel.get('city'))
+        city_words = set(city.split())
+        tokens = [token for token in normalize_key(hotel.get('name')).split()
+                  if token not in STOPWORDS and token not in city_words]
+        # A venue appended after a slash ("... Downtown/Convention Center") says where the hotel
+        # is, not which branch it is, so it neither blocks nor counts as an added location
+        venue = set(normalize_key((hotel.get('name') or '').rpartition('/')[2]).split())
+        venue = venue if '/' in (hotel.get('name') or '') and venue <= LOCATION_WORDS else set()
+        phone = re.sub(r'\D', '', hotel.get('phone') or hotel.get('contact') or '')[-9:]
+        domain = website_domain(hotel.get('website'))
+        name = ' '.join(tokens)
+
+        blocks = []
+        if len(tokens) >= 1:
+            blocks.append(('name', city, ' '.join(tokens[:2])))
+        if len(phone) >= 7:
+            blocks.append(('phone', city, phone))
+        if domain:
+            blocks.append(('domain', city, domain))
+        return {'name': name, 'tokens': frozenset(tokens), 'venue': frozenset(venue),
+                'places': LOCATION_WORDS.intersection(tokens) - venue,
+                'phone': phone if len(phone) >= 7 else '', 'domain': domain, 'blocks': blocks}
+
+    @staticmethod
+    def _merge(group):
+        """First record of a group, with empty fields filled from its duplicates"""
+        hotel = dict(group[0])
+        for other in group[1:]:
+            for field, value in other.items():
+                if value not in (None, '') and hotel.get(field) in (None, ''):
+                    hotel[field] = value
+        if len(group) > 1:
+            hotel['sources'] = sorted({other.get('source') for other in group if other.get('source')})
+        return hotel
+
+
+def name_similarity(left, right):
+    """0..1, 1.0 when a name of 3+ words contains every word of the other and adds no location (but a venue)"""
+    a, b = left['tokens'], right['tokens']
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    shorter = min(len(a), len(b))
+    only_a, only_b = a - b, b - a
+    # "Hilton Garden Inn Downtown" vs "Hilton Garden Inn Downtown & Suites", two words are
+    # too little, and added location words name another branch ("... Austin" / "... Austin North")
+    added = (only_a | only_b) - left['venue'] - right['venue']
+    if shorter >= 3 and shared == shorter and LOCATION_WORDS.isdisjoint(added):
+        return 1.0
+    if shared == 0:
+        return 0.0
+    # Words only one side has may still be typos of each other ("Dowtown" / "Downtown"),
+    # they count as shared in proportion to how alike they are, if they are close at all
+    fuzzy = 0.0
+    if only_a and only_b:
+        ratio = SequenceMatcher(None, ' '.join(sorted(only_a)), ' '.join(sorted(only_b))).ratio()
+        if ratio >= 0.8:
+            fuzzy = ratio * min(len(only_a), len(only_b))
+    return (shared + fuzzy) / (shared + max(len(only_a), len(only_b)))
+
+
+def website_domain(url):
+    """Registrable-ish host of a hotel website (no www.), '' for booking/search sites"""
+    if not url:
+        return ''
+    host = (urlsplit(url if '//' in url else f'//{url}').hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if not host or host.endswith(SHARED_HOSTS):
+        return ''
+    return host
+
+
+def remove_duplicates(hotels, **kwargs):
+    """Merge duplicate hotels (fuzzy names, shared phone or website), see DuplicateResolver"""
+    return DuplicateResolver(**kwargs).resolve(hotels)
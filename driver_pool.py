@@ -0,0 +1,164 @@
+import atexit
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class DriverPool:
+    """Fixed-size pool of Selenium WebDrivers shared across scrape jobs.
+
+    A driver whose page loads fail max_failures times in a row (typically a
+    dead proxy it was launched with) is quit on checkin and relaunched on
+    demand. A driver is reset (cookies, storage, extra tabs) when a different
+    owner (scrape job) checks it out, not between the pages of one job.
+    """
+
+    def __init__(self, factory, size=2, checkout_timeout=300, max_failures=3):
+        self.factory = factory
+        self.size = max(1, size)
+        self.checkout_timeout = checkout_timeout
+        self.max_failures = max(1, max_failures)
+        self._idle = queue.LifoQueue()  # most recently used driver first, keeps warm ones busy
+        self._failures = {}
+        self._owners = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def checkout(self, timeout=None, owner=None):
+        """Take a driver out of the pool, reset first if another owner used it last"""
+        while True:
+            driver = self._take(timeout)
+            if driver is None:
+                return None
+            with self._lock:
+                previous = self._owners.get(id(driver), owner)
+                self._owners[id(driver)] = owner
+            if previous is owner or self.reset_driver(driver):
+                return driver
+            self._discard(driver)
+
+    def _take(self, timeout=None):
+        """An idle driver, or a new one if under capacity"""
+        if self._closed:
+            return None
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            driver = self.factory()
+            if driver is None:
+                with self._lock:
+                    self._created -= 1
+            return driver
+
+        try:
+            return self._idle.get(timeout=timeout or self.checkout_timeout)
+        except queue.Empty:
+            print(f"Timed out waiting for a WebDriver from the pool (size={self.size})")
+            return None
+
+    def report(self, driver, ok):
+        """Record a page load through driver, True once it has failed too often to keep"""
+        with self._lock:
+            failures = 0 if ok else self._failures.get(id(driver), 0) + 1
+            self._failures[id(driver)] = failures
+        return failures >= self.max_failures
+
+    def checkin(self, driver, discard=False):
+        """Return a driver to the pool as it is, its owner may check it out again"""
+        if driver is None:
+            return
+
+        with self._lock:
+            discard = discard or self._failures.get(id(driver), 0) >= self.max_failures
+        if not discard and not self._closed:
+            self._idle.put(driver)
+            return
+
+        self._discard(driver)
+
+    @contextmanager
+    def borrow(self, timeout=None, owner=None):
+        """Context manager around checkout/checkin"""
+        driver = self.checkout(timeout, owner)
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def reset_driver(self, driver):
+        """Clear cookies, storage and extra tabs so a new job starts clean"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass  # about:blank and some error pages have no storage
+
+            driver.delete_all_cookies()
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            except Exception:
+                pass  # not a Chromium driver
+
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            print(f"Discarding WebDriver that failed to reset: {e}")
+            return False
+
+    def shutdown(self):
+        """Quit every idle driver; checked-out drivers are quit on checkin"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    def _discard(self, driver):
+        """Quit a driver and free its slot"""
+        self._quit(driver)
+        with self._lock:
+            self._created -= 1
+
+    def _quit(self, driver):
+        with self._lock:
+            self._failures.pop(id(driver), None)
+            self._owners.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Failed to quit WebDriver: {e}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool(factory, size=None):
+    """Process-wide driver pool, created on first use (size from DRIVER_POOL_SIZE)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            if size is None:
+                size = int(os.environ.get('DRIVER_POOL_SIZE', 2))
+            _pool = DriverPool(factory, size=size)
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,238 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+from metrics import FETCH_RETRIES
+
+# Try importing aiohttp (optional, falls back to requests in worker threads)
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+def _error_response(error):
+    """(status, headers) of an HTTP error, (None, {}) when no response came back"""
+    response = getattr(error, 'response', None)
+    if response is not None:  # requests.HTTPError
+        return response.status_code, dict(response.headers)
+    return getattr(error, 'status', None), dict(getattr(error, 'headers', None) or {})
+
+
+class HostLimiter:
+    """Thread-safe cap on concurrent work per host"""
+
+    def __init__(self, per_host_limit=4):
+        self.per_host_limit = max(1, per_host_limit)
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, url):
+        host = urlparse(url).netloc.lower() if '://' in url else url.lower()
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+        with semaphore:
+            yield
+
+
+class AsyncFetchEngine:
+    """Fetch many pages concurrently with a bounded number of requests per host.
+
+    Blocking callers share one event loop on a background thread and one
+    HTTP session on it, so connections are kept alive across calls.
+    """
+
+    def __init__(self, headers, proxy_picker=None, per_host_limit=4, timeout=15,
+                 cache=None, proxy_reporter=None, rate_limiter=None):
+        self.headers = dict(headers)
+        self.cache = cache
+        self.proxy_picker = proxy_picker
+        self.proxy_reporter = proxy_reporter
+        self.per_host_limit = max(1, per_host_limit)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._local = threading.local()
+        self._loop = None
+        self._session = None
+        self._loop_lock = threading.Lock()
+
+    async def fetch(self, url, retries=5, bypass_cache=False):
+        """Fetch a single URL, returns the page text or None"""
+        if not url:
+            return None
+        async with self._open_session() as session:
+            return await self._fetch_cached(url, retries, session, bypass_cache)
+
+    async def fetch_many(self, urls, retries=5, bypass_cache=False):
+        """Fetch URLs concurrently, yielding (url, html) pairs as they complete"""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return
+
+        host_limits = {}
+        async with self._open_session() as session:
+            tasks = [
+                asyncio.ensure_future(self._fetch_limited(url, retries, session, host_limits, bypass_cache))
+                for url in urls
+            ]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    def fetch_sync(self, url, retries=5, bypass_cache=False):
+        """Blocking helper: fetch a single URL on the engine's loop"""
+        return self.run(self.fetch(url, retries, bypass_cache))
+
+    def fetch_batch(self, urls, retries=5, bypass_cache=False):
+        """Blocking helper: fetch URLs concurrently and return {url: html}"""
+        async def collect():
+            return {url: html async for url, html in self.fetch_many(urls, retries, bypass_cache)}
+        return self.run(collect())
+
+    def run(self, coro):
+        """Run a coroutine on the engine's background loop and wait for its result (any thread)"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='fetch-loop', daemon=True).start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self):
+        """Cancel fetches still running, close the shared session and stop the background loop"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _shutdown(self):
+        # Threads blocked in run() get CancelledError instead of waiting on a stopped loop
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _fetch_limited(self, url, retries, session, host_limits, bypass_cache):
+        host = urlparse(url).netloc.lower()
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+
+        async with host_limits[host]:
+            return url, await self._fetch_cached(url, retries, session, bypass_cache)
+
+    async def _fetch_cached(self, url, retries, session, bypass_cache):
+        """Serve fresh pages from the cache, revalidate stale ones with ETag/Last-Modified"""
+        if not self.cache or bypass_cache:
+            _, text, _ = await self._fetch_with_retries(url, retries, session)
+            return text
+
+        cached = self.cache.lookup(url)
+        if cached and cached['fresh']:
+            return cached['body']
+
+        validators = {}
+        if cached and cached.get('etag'):
+            validators['If-None-Match'] = cached['etag']
+        if cached and cached.get('last_modified'):
+            validators['If-Modified-Since'] = cached['last_modified']
+
+        status, text, headers = await self._fetch_with_retries(url, retries, session, validators)
+        if status == 304 and cached:
+            self.cache.touch(url)
+            return cached['body']
+        if text is not None:
+            self.cache.put(url, text, etag=headers.get('ETag'), last_modified=headers.get('Last-Modified'))
+        return text
+
+    async def _fetch_with_retries(self, url, retries, session, extra_headers=None):
+        """Returns (status, text, headers), text is None when every attempt failed"""
+        for attempt in range(retries):
+            # The limiter spaces attempts per domain, so retries need no sleep of their own
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async(url)
+            proxy = self.proxy_picker() if self.proxy_picker else None
+            started = time.monotonic()
+            try:
+                status, text, headers = await self._fetch_once(url, proxy, session, extra_headers)
+            except Exception as e:
+                status, headers = _error_response(e)
+                self._report_proxy(proxy, False)
+                self._report_rate(url, status, None, headers)
+                FETCH_RETRIES.inc(proxied=bool(proxy))
+                print(f"[Retry {attempt+1}] Failed with proxy {proxy}: {e}")
+                continue
+
+            if self._report_rate(url, status, text, headers):
+                self._report_proxy(proxy, False)
+                FETCH_RETRIES.inc(proxied=bool(proxy))
+                print(f"[Retry {attempt+1}] Captcha page from {url} with proxy {proxy}")
+                continue
+            self._report_proxy(proxy, True, time.monotonic() - started)
+            return status, text, headers
+        return None, None, {}
+
+    def _report_proxy(self, proxy, ok, latency=None):
+        if proxy and self.proxy_reporter:
+            self.proxy_reporter(proxy, ok, latency)
+
+    def _report_rate(self, url, status, text, headers):
+        """Feed a response into the rate limiter, True if the site pushed back"""
+        if not self.rate_limiter:
+            return False
+        return self.rate_limiter.report(url, status=status, html=text, headers=headers)
+
+    async def _fetch_once(self, url, proxy, session, extra_headers=None):
+        if session is not None:
+            async with session.get(url, proxy=proxy, headers=extra_headers) as response:
+                response.raise_for_status()
+                return response.status, await response.text(), dict(response.headers)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._fetch_blocking, url, proxy, extra_headers)
+
+    def _fetch_blocking(self, url, proxy, extra_headers=None):
+        """requests fallback, one session per worker thread (the loop's executor threads are long-lived)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+
+        proxies = {"http": proxy, "https": proxy} if proxy else None
+        response = session.get(url, timeout=self.timeout, proxies=proxies, headers=extra_headers)
+        response.raise_for_status()
+        return response.status_code, response.text, dict(response.headers)
+
+    @asynccontextmanager
+    async def _open_session(self):
+        if not AIOHTTP_AVAILABLE:
+            yield None
+            return
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        if asyncio.get_running_loop() is self._loop:
+            # Kept open for the engine's lifetime, closed by close()
+            if self._session is None:
+                self._session = aiohttp.ClientSession(headers=self.headers, timeout=timeout)
+            yield self._session
+            return
+
+        # Awaited from a caller's own loop: a session for this batch only
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout) as session:
+            yield session
@@ -0,0 +1,140 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# Details copied from the store instead of re-fetching the hotel page
+ENRICHED_FIELDS = ('phone', 'email', 'website')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hotels (
+    name_key TEXT NOT NULL,
+    city_key TEXT NOT NULL,
+    country_key TEXT NOT NULL,
+    source TEXT NOT NULL,
+    name TEXT,
+    city TEXT,
+    country TEXT,
+    rating REAL,
+    price TEXT,
+    price_amount TEXT,
+    phone TEXT,
+    email TEXT,
+    website TEXT,
+    url TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    enriched_at REAL,
+    PRIMARY KEY (name_key, city_key, country_key, source)
+)
+"""
+
+UPSERT = """
+INSERT INTO hotels (name_key, city_key, country_key, source, name, city, country, rating, price,
+                    price_amount, phone, email, website, url, first_seen, last_seen, enriched_at)
+VALUES (:name_key, :city_key, :country_key, :source, :name, :city, :country, :rating, :price,
+        :price_amount, :phone, :email, :website, :url, :now, :now, :enriched_at)
+ON CONFLICT (name_key, city_key, country_key, source) DO UPDATE SET
+    name = excluded.name,
+    rating = COALESCE(excluded.rating, rating),
+    price = COALESCE(excluded.price, price),
+    price_amount = COALESCE(excluded.price_amount, price_amount),
+    phone = COALESCE(excluded.phone, phone),
+    email = COALESCE(excluded.email, email),
+    website = COALESCE(excluded.website, website),
+    url = COALESCE(excluded.url, url),
+    last_seen = excluded.last_seen,
+    enriched_at = COALESCE(excluded.enriched_at, enriched_at)
+"""
+
+
+def normalize_key(text):
+    """Case, accent and punctuation insensitive form of a name/city/country"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r'[\W_]+', ' ', text.lower()).strip()
+
+
+class HotelStore:
+    """SQLite table of every hotel seen, remembering when its detail page was last enriched"""
+
+    def __init__(self, path, enrich_ttl=7 * 24 * 3600):
+        self.path = path
+        self.enrich_ttl = enrich_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(SCHEMA)
+
+    def fresh_details(self, hotel):
+        """Stored phone/email/website if the hotel was enriched within enrich_ttl, else None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT enriched_at, phone, email, website FROM hotels '
+                'WHERE name_key = ? AND city_key = ? AND country_key = ? AND source = ?',
+                self._key(hotel)
+            ).fetchone()
+            fresh = row is not None and row['enriched_at'] is not None \
+                and time.time() - row['enriched_at'] < self.enrich_ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return {field: row[field] for field in ENRICHED_FIELDS} if fresh else None
+
+    def record(self, hotel, enriched=False):
+        """Insert or update a hotel, stamping enriched_at when its details were just fetched"""
+        now = time.time()
+        name_key, city_key, country_key, source = self._key(hotel)
+        params = {
+            'name_key': name_key, 'city_key': city_key, 'country_key': country_key, 'source': source,
+            'name': hotel.get('name'), 'city': hotel.get('city'), 'country': hotel.get('country'),
+            'rating': hotel.get('rating'), 'price': hotel.get('price'),
+            'price_amount': hotel.get('price_amount'),
+            'phone': hotel.get('phone') or hotel.get('contact'), 'email': hotel.get('email'),
+            'website': hotel.get('website'), 'url': hotel.get('url') or None,
+            'now': now, 'enriched_at': now if enriched else None
+        }
+        with self._lock, self._conn:
+            self._conn.execute(UPSERT, params)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            hotels = self._conn.execute('SELECT COUNT(*) FROM hotels').fetchone()[0]
+            return {
+                'hotels': hotels,
+                'fresh_hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _key(hotel):
+        return (normalize_key(hotel.get('name')), normalize_key(hotel.get('city')),
+                normalize_key(hotel.get('country')), hotel.get('source') or '')
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_hotel_store(path=None, enrich_ttl=None):
+    """Process-wide store per database file (defaults from HOTEL_STORE_PATH/HOTEL_ENRICH_TTL)"""
+    path = os.path.abspath(path or os.environ.get('HOTEL_STORE_PATH', '.hotels.sqlite3'))
+    with _stores_lock:
+        if path not in _stores:
+            if enrich_ttl is None:
+                enrich_ttl = int(os.environ.get('HOTEL_ENRICH_TTL', 7 * 24 * 3600))
+            _stores[path] = HotelStore(path, enrich_ttl=enrich_ttl)
+        return _stores[path]
@@ -0,0 +1,85 @@
+import os
+
+from bs4 import BeautifulSoup
+
+# Try importing the fast parser backends (optional)
+try:
+    import lxml  # noqa: F401  (used through BeautifulSoup's 'lxml' tree builder)
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SELECTOLAX_AVAILABLE = False
+
+BACKENDS = ('html.parser', 'lxml', 'selectolax')
+DEFAULT_BACKEND = os.environ.get('HTML_PARSER', 'html.parser')
+
+
+class SelectolaxNode:
+    """Wraps a selectolax node with the subset of the BeautifulSoup API the scraper uses"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, selector):
+        return [SelectolaxNode(node) for node in self._node.css(selector)]
+
+    def select_one(self, selector):
+        node = self._node.css_first(selector)
+        return SelectolaxNode(node) if node is not None else None
+
+    def get_text(self, separator='', strip=False):
+        return self._node.text(deep=True, separator=separator, strip=strip)
+
+    @property
+    def attrs(self):
+        # Bare attributes come back as None, BeautifulSoup reports them as ''
+        return {key: value if value is not None else '' for key, value in self._node.attributes.items()}
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+
+class SelectolaxDocument(SelectolaxNode):
+    """Document root, text is taken from the <html> element"""
+
+    __slots__ = ()
+
+    def get_text(self, separator='', strip=False):
+        root = self._node.root
+        return root.text(deep=True, separator=separator, strip=strip) if root is not None else ''
+
+
+def resolve_backend(backend=None):
+    """Pick a backend, falling back to html.parser when the requested one is not installed"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend {backend!r}, expected one of {BACKENDS}")
+    if backend == 'lxml' and not LXML_AVAILABLE:
+        print("lxml not installed, falling back to html.parser")
+        return 'html.parser'
+    if backend == 'selectolax' and not SELECTOLAX_AVAILABLE:
+        print("selectolax not installed, falling back to html.parser")
+        return 'html.parser'
+    return backend
+
+
+def parse_html(html, backend=None):
+    """Parse html into a document supporting select/select_one/get_text/attrs"""
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        return SelectolaxDocument(SelectolaxParser(html))
+    return BeautifulSoup(html, backend)
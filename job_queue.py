@@ -0,0 +1,118 @@
+import queue
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from metrics import JOBS_IN_FLIGHT, JOBS_TOTAL
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at its configured depth"""
+
+
+class Job:
+    """A single scrape job and its lifecycle"""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status in ('finished', 'failed')
+
+    def to_dict(self):
+        def fmt(ts):
+            return ts.isoformat(timespec='seconds') if ts else None
+
+        return {
+            'id': self.id,
+            'status': self.status,
+            'params': self.params,
+            'created_at': fmt(self.created_at),
+            'started_at': fmt(self.started_at),
+            'finished_at': fmt(self.finished_at),
+            'result': self.result,
+            'error': self.error
+        }
+
+
+class JobQueue:
+    """Bounded in-process job queue drained by a fixed set of worker threads"""
+
+    def __init__(self, handler, workers=2, max_queued=10, keep_finished=200):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.keep_finished = keep_finished
+        self._queue = queue.Queue(maxsize=max(1, max_queued))
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, **params):
+        """Queue a job and return it immediately"""
+        self._start_workers()
+        job = Job(params)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFull(f"Job queue is full ({self._queue.maxsize} waiting)")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == 'running')
+        return {'queued': self._queue.qsize(), 'running': running, 'workers': self.workers}
+
+    def _start_workers(self):
+        # Started lazily so forking servers (gunicorn) spawn threads in the worker process
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"scrape-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.status = 'running'
+            job.started_at = datetime.now()
+            JOBS_IN_FLIGHT.inc()
+            try:
+                job.result = self.handler(**job.params)
+                job.status = 'finished'
+            except Exception as e:
+                traceback.print_exc()
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                job.finished_at = datetime.now()
+                JOBS_IN_FLIGHT.dec()
+                JOBS_TOTAL.inc(status=job.status)
+                self._queue.task_done()
+                self._prune()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond keep_finished"""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.done]
+            for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[job_id]
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from hotel_store import normalize_key
+
+
+def hotel_key(hotel):
+    """Identity of a hotel in the journal: normalized name, city and country plus source"""
+    return '|'.join([normalize_key(hotel.get('name')), normalize_key(hotel.get('city')),
+                     normalize_key(hotel.get('country')), hotel.get('source') or ''])
+
+
+def city_key(city, country):
+    return f"{normalize_key(city)}|{normalize_key(country)}"
+
+
+class Journal:
+    """Append-only NDJSON log of finished work (search pages, hotels, cities) a restarted run resumes from.
+
+    Records are fsynced every sync_every records or sync_interval seconds,
+    and right away when a city completes. Hotels stay on disk, only their
+    offsets are kept in memory.
+    """
+
+    def __init__(self, path, resume=False, sync_every=100, sync_interval=5.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._cities = set()
+        self._pages = {}
+        self._hotels = {}
+        self._city_hotels = defaultdict(list)
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._load()
+        else:
+            open(path, 'wb').close()
+        self._file = open(path, 'ab')
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def city_done(self, city, country):
+        with self._lock:
+            return city_key(city, country) in self._cities
+
+    def page(self, city, country, source, offset=0):
+        """{'keys': [...], 'hotels': [...]} of a search page finished earlier, else None"""
+        with self._lock:
+            return self._pages.get((city_key(city, country), source, offset))
+
+    def has_hotel(self, hotel):
+        with self._lock:
+            return hotel_key(hotel) in self._hotels
+
+    def hotel(self, key):
+        """Journaled hotel by hotel_key, or None"""
+        with self._lock:
+            offset = self._hotels.get(key)
+        return self._read(offset)['hotel'] if offset is not None else None
+
+    def hotels(self, city, country):
+        """Every hotel journaled for a city, in the order they finished"""
+        with self._lock:
+            offsets = list(self._city_hotels.get(city_key(city, country), ()))
+        return [self._read(offset)['hotel'] for offset in offsets]
+
+    def record_hotel(self, hotel):
+        self._append({'type': 'hotel', 'hotel': hotel})
+
+    def record_page(self, city, country, source, offset, keys, hotels):
+        """A search page whose hotels have all been journaled, keys being every card seen on it"""
+        self._append({'type': 'page', 'city': city, 'country': country, 'source': source, 'offset': offset,
+                      'keys': list(keys), 'hotels': [hotel_key(hotel) for hotel in hotels]})
+
+    def record_city(self, city, country):
+        self._append({'type': 'city', 'city': city, 'country': country}, sync=True)
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def stats(self):
+        with self._lock:
+            return {'cities': len(self._cities), 'pages': len(self._pages), 'hotels': len(self._hotels)}
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _append(self, record, sync=False):
+        line = json.dumps(record, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._index(record, offset)
+            self._unsynced += 1
+            if sync or self._unsynced >= self.sync_every \
+                    or time.monotonic() - self._synced_at >= self.sync_interval:
+                self._sync()
+
+    def _sync(self):
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def _index(self, record, offset):
+        kind = record.get('type')
+        if kind == 'hotel':
+            hotel = record['hotel']
+            self._hotels[hotel_key(hotel)] = offset
+            self._city_hotels[city_key(hotel.get('city'), hotel.get('country'))].append(offset)
+        elif kind == 'page':
+            key = (city_key(record['city'], record['country']), record['source'], record['offset'])
+            self._pages[key] = {'keys': record['keys'], 'hotels': record['hotels']}
+        elif kind == 'city':
+            self._cities.add(city_key(record['city'], record['country']))
+
+    def _load(self):
+        """Index an existing journal, cutting off a last line torn by a crash"""
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                self._index(record, valid_end)
+                valid_end += len(line)
+        if valid_end < os.path.getsize(self.path):
+            os.truncate(self.path, valid_end)
+
+    def _read(self, offset):
+        with self._lock:
+            if self._unsynced:
+                self._file.flush()
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
@@ -0,0 +1,112 @@
+import json
+import threading
+from collections import Counter
+
+
+def by_extension(*extensions):
+    """Blocked-URL patterns for files ending in extension, with or without a query string.
+
+    setBlockedURLs matches a wildcard against the whole URL, so '*.ico*'
+    would also block https://www.iconhotel.com/.
+    """
+    return tuple(pattern for extension in extensions for pattern in (f'*.{extension}', f'*.{extension}?*'))
+
+
+# URL patterns per resource kind, blocked through DevTools Network.setBlockedURLs
+IMAGES = by_extension('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico')
+FONTS = by_extension('woff', 'woff2', 'ttf', 'otf', 'eot')
+STYLESHEETS = by_extension('css')
+MEDIA = by_extension('mp4', 'webm', 'mp3', 'm3u8')
+TRACKERS = ('*doubleclick.net*', '*googlesyndication.com*', '*googletagmanager.com*', '*google-analytics.com*',
+            '*adservice.google.*', '*facebook.net*', '*connect.facebook.*', '*hotjar.com*', '*criteo.*',
+            '*bat.bing.com*', '*scorecardresearch.com*', '*taboola.com*', '*outbrain.com*')
+
+# What each kind of page loads without. Maps renders its feed with its own scripts and styles, so
+# only pixels go; pages we read as static HTML drop stylesheets too.
+PROFILES = {
+    'booking_search': IMAGES + FONTS + STYLESHEETS + MEDIA + TRACKERS,
+    'booking_hotel': IMAGES + FONTS + STYLESHEETS + MEDIA + TRACKERS,
+    'google_search': IMAGES + FONTS + STYLESHEETS + MEDIA + TRACKERS,
+    'maps_search': IMAGES + FONTS + MEDIA + TRACKERS,
+    'maps_place': IMAGES + FONTS + MEDIA + TRACKERS,
+    'default': IMAGES + FONTS + STYLESHEETS + MEDIA + TRACKERS,
+}
+
+# Median transfer size per DevTools resource type (HTTP Archive), to estimate what blocking saved
+TYPICAL_BYTES = {'Image': 12_000, 'Font': 25_000, 'Stylesheet': 15_000, 'Media': 250_000,
+                 'Script': 20_000, 'XHR': 3_000, 'Fetch': 3_000, 'Other': 2_000}
+
+
+class NetworkLog:
+    """Running tally of one Chrome's DevTools Network events, read from its performance log"""
+
+    def __init__(self):
+        self.available = True
+        self.inflight = set()
+        self.bytes = 0
+        self.blocked = Counter()
+        self._types = {}
+        self._lock = threading.Lock()
+
+    def drain(self, driver):
+        """Consume the events logged since the last call"""
+        if not self.available:
+            return
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            self.available = False
+            return
+        with self._lock:
+            for entry in entries:
+                try:
+                    message = json.loads(entry['message'])['message']
+                except (KeyError, TypeError, ValueError):
+                    continue
+                method = message.get('method')
+                params = message.get('params', {})
+                request_id = params.get('requestId')
+                if method == 'Network.requestWillBeSent':
+                    self.inflight.add(request_id)
+                    self._types[request_id] = params.get('type') or 'Other'
+                elif method == 'Network.loadingFinished':
+                    self.inflight.discard(request_id)
+                    self._types.pop(request_id, None)
+                    self.bytes += params.get('encodedDataLength') or 0
+                elif method == 'Network.loadingFailed':
+                    self.inflight.discard(request_id)
+                    kind = self._types.pop(request_id, None) or params.get('type') or 'Other'
+                    if params.get('blockedReason'):
+                        self.blocked[kind] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return self.bytes, Counter(self.blocked)
+
+
+def network_log(driver):
+    """The NetworkLog kept on a driver (one per Chrome, it outlives single page loads)"""
+    log = getattr(driver, '_network_log', None)
+    if log is None:
+        log = driver._network_log = NetworkLog()
+    return log
+
+
+def apply_profile(driver, profile):
+    """Block profile's URL patterns on driver, a no-op when they are already in place"""
+    patterns = PROFILES.get(profile, PROFILES['default']) if profile else ()
+    if getattr(driver, '_blocked_patterns', None) == patterns:
+        return True
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+    except Exception as e:
+        print(f"Could not set resource blocking on Chrome: {e}")
+        return False
+    driver._blocked_patterns = patterns
+    return True
+
+
+def bytes_saved(blocked):
+    """Estimated bytes not downloaded for a Counter of blocked requests per resource type"""
+    return sum(TYPICAL_BYTES.get(kind, TYPICAL_BYTES['Other']) * count for kind, count in blocked.items())
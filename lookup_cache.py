@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from hotel_store import normalize_key
+from metrics import LOOKUPS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lookups (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+)
+"""
+
+# Returned by get() when nothing usable is cached, None is a cached "not found"
+MISSING = object()
+
+DAY = 24 * 3600
+
+
+def lookup_key(name, city, country):
+    """Cache key of a hotel, insensitive to case, accents and punctuation"""
+    return '|'.join(normalize_key(part) for part in (name, city, country))
+
+
+class LookupCache:
+    """SQLite cache of slow per-hotel lookups, remembering "not found" for a shorter time"""
+
+    def __init__(self, path, ttl=30 * DAY, miss_ttl=3 * DAY):
+        self.path = path
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self._counts = defaultdict(lambda: {'hits': 0, 'negative_hits': 0, 'misses': 0})
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(SCHEMA)
+
+    def get(self, kind, key):
+        """Cached value (None for a cached miss) while within its TTL, else MISSING"""
+        with self._lock:
+            row = self._conn.execute('SELECT value, checked_at FROM lookups WHERE kind = ? AND key = ?',
+                                     (kind, key)).fetchone()
+            value, result = MISSING, 'misses'
+            if row is not None:
+                found = row[0] is not None
+                if time.time() - row[1] < (self.ttl if found else self.miss_ttl):
+                    value, result = row[0], 'hits' if found else 'negative_hits'
+            self._counts[kind][result] += 1
+        LOOKUPS.inc(kind=kind, result=result)
+        return value
+
+    def put(self, kind, key, value):
+        """Remember a lookup's outcome, value None meaning it found nothing"""
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO lookups (kind, key, value, checked_at) VALUES (?, ?, ?, ?)',
+                               (kind, key, value, time.time()))
+
+    def stats(self):
+        """Hits, cached misses and real lookups per kind, with the hit rate"""
+        with self._lock:
+            report = {}
+            for kind, counts in self._counts.items():
+                lookups = sum(counts.values())
+                cached = counts['hits'] + counts['negative_hits']
+                report[kind] = dict(counts, hit_rate=round(cached / lookups, 3) if lookups else 0.0)
+            return report
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_lookup_cache(path=None):
+    """Process-wide cache per database file (defaults from LOOKUP_CACHE_PATH/LOOKUP_TTL/LOOKUP_MISS_TTL)"""
+    path = os.path.abspath(path or os.environ.get('LOOKUP_CACHE_PATH', '.lookups.sqlite3'))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = LookupCache(path, ttl=int(os.environ.get('LOOKUP_TTL', 30 * DAY)),
+                                        miss_ttl=int(os.environ.get('LOOKUP_MISS_TTL', 3 * DAY)))
+        return _caches[path]
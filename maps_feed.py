@@ -0,0 +1,118 @@
+import json
+import re
+
+from contact_scanner import best_phone
+
+# Every listing card in the results feed, as [{name, url, rating, phone, website, lines}]
+FEED_SCRIPT = r"""
+const feed = document.querySelector('div[role="feed"]') || document;
+const cards = feed.querySelectorAll('div[role="article"], div.Nv2PK');
+const text = (root, selector) => {
+  const el = root.querySelector(selector);
+  return el ? el.textContent.trim() : null;
+};
+return JSON.stringify(Array.from(cards, card => {
+  const link = card.querySelector('a.hfpxzc, a[href*="/maps/place/"]');
+  const website = card.querySelector('a[data-value="Website"], a.lcr4fd');
+  return {
+    name: card.getAttribute('aria-label') || (link && link.getAttribute('aria-label')) || text(card, '.qBF1Pd'),
+    url: link ? link.href : null,
+    rating: text(card, '.MW4etd'),
+    phone: text(card, '.UsdlK'),
+    website: website ? website.href : null,
+    lines: Array.from(card.querySelectorAll('.W4Efsd'), el => el.textContent.trim())
+  };
+}));
+"""
+
+# Listings currently in the feed, used to tell when scrolling stops loading more
+FEED_COUNT_SCRIPT = r"""
+const feed = document.querySelector('div[role="feed"]');
+return feed ? feed.querySelectorAll('div[role="article"], div.Nv2PK').length : 0;
+"""
+
+# Scroll the feed to its end so Maps lazy-loads the next batch, true once the end marker shows
+FEED_SCROLL_SCRIPT = r"""
+const feed = document.querySelector('div[role="feed"]');
+if (!feed) return true;
+feed.scrollTop = feed.scrollHeight;
+return !!feed.querySelector('span.HlvSq') || /reached the end of the list/i.test(feed.innerText.slice(-300));
+"""
+
+# Phone, website and address from an open place panel
+PANEL_SCRIPT = r"""
+const item = selector => document.querySelector(selector);
+const phone = item('button[data-item-id^="phone:tel:"]');
+const website = item('a[data-item-id="authority"]');
+const address = item('button[data-item-id="address"]');
+return JSON.stringify({
+  phone: phone ? phone.getAttribute('data-item-id').slice('phone:tel:'.length) : null,
+  website: website ? website.href : null,
+  address: address ? address.textContent.trim() : null
+});
+"""
+
+# Fields a listing should end up with, missing ones are read from the place panel
+PANEL_FIELDS = ('phone', 'website')
+
+_RATING_RE = re.compile(r'\d+(?:[.,]\d+)?')
+
+
+def parse_listings(payload, city, country):
+    """Hotels from FEED_SCRIPT's JSON, skipping cards without a name"""
+    hotels = []
+    seen = set()
+    for row in json.loads(payload or '[]'):
+        name = (row.get('name') or '').strip()
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        lines = row.get('lines') or []
+        phone = best_phone(row.get('phone') or '') or best_phone(' '.join(lines), kinds=('nanp', 'international'))
+        hotels.append({
+            'name': name,
+            'city': city,
+            'country': country,
+            'source': 'Google Maps',
+            'rating': parse_rating(row.get('rating')),
+            'phone': phone,
+            'contact': phone,
+            'website': row.get('website'),
+            'address': address_from_lines(lines, phone),
+            'url': row.get('url')
+        })
+    return hotels
+
+
+def parse_panel(payload, hotel):
+    """Fill hotel's missing fields from PANEL_SCRIPT's JSON"""
+    panel = json.loads(payload or '{}')
+    if not hotel.get('phone') and panel.get('phone'):
+        hotel['phone'] = hotel['contact'] = best_phone(panel['phone']) or panel['phone']
+    if not hotel.get('website') and panel.get('website'):
+        hotel['website'] = panel['website']
+    if not hotel.get('address') and panel.get('address'):
+        hotel['address'] = panel['address']
+    return hotel
+
+
+def missing_fields(hotel):
+    return [field for field in PANEL_FIELDS if not hotel.get(field)]
+
+
+def parse_rating(text):
+    match = _RATING_RE.search(text or '')
+    return float(match.group().replace(',', '.')) if match else None
+
+
+def address_from_lines(lines, phone=None):
+    """Street address out of a card's info lines ("Hotel · 12 Main St · Open 24 hours")"""
+    for line in lines:
+        for part in line.split('·'):
+            part = part.strip()
+            if not part or (phone and part == phone) or best_phone(part):
+                continue
+            # Addresses carry a house number, categories and opening hours mostly don't
+            if re.search(r'\d', part) and not re.search(r'(?i)\b(open|close[sd]?|stars?|reviews?)\b|\(\d', part):
+                return part
+    return None
@@ -0,0 +1,191 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds, spanning a parse (milliseconds) up to a slow Chrome page load with retries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Metric:
+    """Base of the process-wide metrics, one time series per label set"""
+
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labels, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{self._label_text(key)} {_number(value)}"]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def __init__(self, name, help, labels=(), function=None):
+        super().__init__(name, help, labels)
+        self.function = function  # read at scrape time instead of a stored value
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        if self.function is not None:
+            self.set(self.function())
+        return super().render()
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # One count per bucket plus the total (the +Inf bucket) at the end
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self, key, value):
+        counts, total = value
+        lines = [f"{self.name}_bucket{self._label_text(key, [('le', _number(bound))])} {count}"
+                 for bound, count in zip(self.buckets, counts)]
+        lines.append(f"{self.name}_bucket{self._label_text(key, [('le', '+Inf')])} {counts[-1]}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = Histogram('scraper_stage_seconds', 'Time spent per scrape stage', ['stage'])
+STAGE_FAILURES = Counter('scraper_stage_failures_total', 'Stage calls that raised or returned nothing', ['stage'])
+FETCH_RETRIES = Counter('scraper_fetch_retries_total', 'Failed fetch attempts that were retried or given up on',
+                        ['proxied'])
+JOBS_IN_FLIGHT = Gauge('scraper_jobs_in_flight', 'Scrape jobs currently running')
+JOBS_IN_FLIGHT.set(0)
+JOBS_TOTAL = Counter('scraper_jobs_total', 'Finished scrape jobs', ['status'])
+RATE_LIMIT_WAIT = Histogram('scraper_rate_limit_wait_seconds', 'Time spent waiting for a domain rate limit slot',
+                            ['domain'])
+THROTTLED = Counter('scraper_throttled_total', 'Responses that were 429/503 or a captcha page', ['domain'])
+READY_SECONDS = Histogram('scraper_page_ready_seconds', 'Time until a browser page met a readiness condition',
+                          ['profile', 'condition'])
+READY_TIMEOUTS = Counter('scraper_page_ready_timeouts_total', 'Readiness conditions that ran out of time',
+                         ['profile', 'condition'])
+PAGE_LOAD_SECONDS = Histogram('scraper_page_load_seconds', 'Browser navigation until the page was ready',
+                              ['profile', 'blocking'])
+PAGE_BYTES = Histogram('scraper_page_bytes', 'Bytes Chrome transferred per page load', ['profile'],
+                       buckets=(50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6))
+BLOCKED_REQUESTS = Counter('scraper_blocked_requests_total', 'Requests Chrome did not make because of a load profile',
+                           ['profile', 'type'])
+BYTES_SAVED = Counter('scraper_bytes_saved_total', 'Estimated bytes not downloaded because of load profiles',
+                      ['profile'])
+LOOKUPS = Counter('scraper_lookup_cache_total', 'Lookup cache reads by result (hits, negative_hits, misses)',
+                  ['kind', 'result'])
+DOMAIN_RATE = Gauge('scraper_domain_rate', 'Requests per second currently allowed per domain', ['domain'])
+
+
+def timed(stage, fail_on_none=False):
+    """Decorator recording a call's duration under stage, and a failure if it raises (or returns None)"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                STAGE_FAILURES.inc(stage=stage)
+                raise
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+            if fail_on_none and result is None:
+                STAGE_FAILURES.inc(stage=stage)
+            return result
+        return wrapper
+    return decorator
+
+
+def render():
+    return REGISTRY.render()
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def normalize_url(url):
+    """Canonical form of a URL used as cache key (case, default ports, query order, fragment)"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+class PageCache:
+    """On-disk page cache keyed by normalized URL, with TTL and size-bounded LRU eviction"""
+
+    def __init__(self, cache_dir, ttl=6 * 3600, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._entries())
+
+    def lookup(self, url):
+        """Cached entry for url (fresh or stale) or None, counting a hit or miss"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        fresh = time.time() - meta['stored_at'] < self.ttl
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if fresh:
+            self._mark_used(body_path)
+        return dict(meta, body=body, fresh=fresh)
+
+    def get(self, url):
+        """Fresh cached body for url, or None"""
+        entry = self.lookup(url)
+        return entry['body'] if entry and entry['fresh'] else None
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store a page, evicting least recently used pages when over max_bytes"""
+        if body is None:
+            return
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+
+        data = body.encode('utf-8')
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, body_path)
+        self._write_meta(meta_path, {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time()
+        })
+
+        with self._lock:
+            self._total_bytes += len(data) - old_size
+            over_budget = self._total_bytes > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def touch(self, url):
+        """Mark a stale entry fresh again after a 304 Not Modified"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        meta['stored_at'] = time.time()
+        self._write_meta(meta_path, meta)
+        self._mark_used(body_path)
+        with self._lock:
+            self.revalidated += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'bytes': self._total_bytes
+            }
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[1])  # oldest use first
+            target = self.max_bytes * 0.9
+            for body_path, _, size in entries:
+                if self._total_bytes <= target:
+                    break
+                for path in (body_path, body_path[:-len('.html')] + '.json'):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._total_bytes -= size
+
+    def _entries(self):
+        """(body_path, last_used, size) for every cached page"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.html'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _paths(self, url):
+        key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + '.html', base + '.json'
+
+    def _mark_used(self, body_path):
+        # The file mtime doubles as the last-use time for LRU eviction
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_page_cache(cache_dir=None, ttl=None, max_bytes=None):
+    """Process-wide cache per directory (defaults from PAGE_CACHE_DIR/TTL/MAX_MB)"""
+    cache_dir = os.path.abspath(cache_dir or os.environ.get('PAGE_CACHE_DIR', '.page_cache'))
+    with _caches_lock:
+        if cache_dir not in _caches:
+            if ttl is None:
+                ttl = int(os.environ.get('PAGE_CACHE_TTL', 6 * 3600))
+            if max_bytes is None:
+                max_bytes = int(os.environ.get('PAGE_CACHE_MAX_MB', 512)) * 1024 * 1024
+            _caches[cache_dir] = PageCache(cache_dir, ttl=ttl, max_bytes=max_bytes)
+        return _caches[cache_dir]
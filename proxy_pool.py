@@ -0,0 +1,227 @@
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from bs4 import BeautifulSoup
+
+
+class ProxyStats:
+    """Health record of a single proxy"""
+
+    def __init__(self, url, successes=0, failures=0, consecutive_failures=0, latency=None, last_checked=None):
+        self.url = url
+        self.successes = successes
+        self.failures = failures
+        self.consecutive_failures = consecutive_failures
+        self.latency = latency  # exponentially weighted, seconds
+        self.last_checked = last_checked
+
+    @property
+    def success_rate(self):
+        # Laplace smoothing so unchecked proxies start at 0.5
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def score(self):
+        latency = self.latency if self.latency is not None else 2.0
+        return self.success_rate / (1.0 + latency)
+
+    def record(self, ok, latency=None):
+        self.last_checked = time.time()
+        if ok:
+            self.successes += 1
+            self.consecutive_failures = 0
+            if latency is not None:
+                self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class ProxyManager:
+    """Process-wide proxy list persisted to disk, health-checked and chosen by score"""
+
+    def __init__(self, source_url="https://free-proxy-list.net/", state_path='.proxies.json',
+                 refresh_interval=3600, check_url="https://httpbin.org/ip", check_timeout=5,
+                 check_workers=32, max_consecutive_failures=3):
+        self.source_url = source_url
+        self.state_path = state_path
+        self.refresh_interval = refresh_interval
+        self.check_url = check_url
+        self.check_timeout = check_timeout
+        self.check_workers = check_workers
+        self.max_consecutive_failures = max_consecutive_failures
+        self.loaded_at = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def proxies(self):
+        with self._lock:
+            return list(self._stats)
+
+    def ensure_loaded(self):
+        """Load from disk if fresh enough, otherwise fetch the list (once per process)"""
+        with self._lock:
+            if self.loaded_at:
+                return
+            self.loaded_at = time.time()  # claim the load so concurrent callers don't repeat it
+
+        if self._load_state():
+            print(f"Loaded {len(self._stats)} proxies from {self.state_path}")
+            return
+        self.refresh()
+
+    def refresh(self):
+        """Re-fetch the proxy list, keep stats of known proxies and health-check in the background"""
+        fetched = self._fetch_proxy_list()
+        with self._lock:
+            self._stats = {url: self._stats.get(url) or ProxyStats(url) for url in fetched}
+            self.loaded_at = time.time()
+        print(f"Loaded {len(fetched)} proxies.")
+        self._save_state()
+
+        if fetched:
+            threading.Thread(target=self.health_check, daemon=True).start()
+
+    def health_check(self, proxies=None):
+        """Probe proxies in parallel, recording latency and evicting dead ones"""
+        proxies = proxies or self.proxies
+        with ThreadPoolExecutor(max_workers=self.check_workers) as executor:
+            list(executor.map(self._probe, proxies))
+        self._save_state()
+        usable = len(set(proxies) & set(self.proxies))
+        print(f"Proxy health check done: {usable} of {len(proxies)} proxies kept")
+
+    def choose(self):
+        """Pick a proxy weighted by score, or None when no proxies are available"""
+        self._refresh_if_stale()
+        with self._lock:
+            if not self._stats:
+                return None
+            stats = list(self._stats.values())
+        return random.choices([s.url for s in stats], weights=[s.score for s in stats])[0]
+
+    def report(self, proxy, ok, latency=None):
+        """Record the outcome of a request made through proxy"""
+        if not proxy:
+            return
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if not stats:
+                return
+            stats.record(ok, latency)
+            if stats.consecutive_failures >= self.max_consecutive_failures:
+                del self._stats[proxy]
+
+    def summary(self):
+        with self._lock:
+            stats = sorted(self._stats.values(), key=lambda s: s.score, reverse=True)
+        return [
+            {'proxy': s.url, 'score': round(s.score, 3), 'success_rate': round(s.success_rate, 3),
+             'latency': round(s.latency, 3) if s.latency is not None else None}
+            for s in stats
+        ]
+
+    def _probe(self, proxy):
+        started = time.time()
+        try:
+            response = requests.get(self.check_url, proxies={"http": proxy, "https": proxy},
+                                    timeout=self.check_timeout)
+            response.raise_for_status()
+            self.report(proxy, True, time.time() - started)
+        except Exception:
+            # A proxy that cannot fetch the check URL once is not worth the three strikes live traffic gets
+            with self._lock:
+                self._stats.pop(proxy, None)
+
+    def _refresh_if_stale(self):
+        with self._lock:
+            stale = self.loaded_at and time.time() - self.loaded_at > self.refresh_interval
+            if not stale or self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _fetch_proxy_list(self):
+        """Scrape HTTPS proxies from the public proxy list"""
+        try:
+            print("Loading proxy list...")
+            res = requests.get(self.source_url, timeout=10)
+            soup = BeautifulSoup(res.text, 'html.parser')
+
+            proxy_list = []
+            for row in soup.select("table#proxylisttable tbody tr"):
+                cols = row.find_all("td")
+                if cols[6].text == "yes":  # HTTPS only
+                    ip = cols[0].text.strip()
+                    port = cols[1].text.strip()
+                    proxy_list.append(f"http://{ip}:{port}")
+            return proxy_list
+        except Exception as e:
+            print(f"Failed to load proxies: {e}")
+            return []
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if time.time() - state.get('fetched_at', 0) > self.refresh_interval:
+            return False
+
+        with self._lock:
+            self._stats = {item['url']: ProxyStats(**item) for item in state.get('proxies', [])}
+            self.loaded_at = state['fetched_at']
+        return True
+
+    def _save_state(self):
+        with self._lock:
+            state = {
+                'fetched_at': self.loaded_at,
+                'proxies': [stats.to_dict() for stats in self._stats.values()]
+            }
+        try:
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            print(f"Failed to save proxy state: {e}")
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_proxy_manager(source_url="https://free-proxy-list.net/"):
+    """Process-wide proxy manager (PROXY_STATE_PATH / PROXY_REFRESH_INTERVAL)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ProxyManager(
+                source_url=source_url,
+                state_path=os.environ.get('PROXY_STATE_PATH', '.proxies.json'),
+                refresh_interval=int(os.environ.get('PROXY_REFRESH_INTERVAL', 3600))
+            )
+            atexit.register(_manager._save_state)
+    _manager.ensure_loaded()
+    return _manager
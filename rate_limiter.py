@@ -0,0 +1,149 @@
+import asyncio
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from metrics import DOMAIN_RATE, RATE_LIMIT_WAIT, THROTTLED
+
+# Responses that mean the site wants us to slow down
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# Interstitials served instead of the page (Google "unusual traffic", DataDome, PerimeterX, reCAPTCHA)
+CAPTCHA_MARKERS = ('unusual traffic from your computer network', '/sorry/index', 'captcha-delivery.com',
+                   'px-captcha', 'g-recaptcha', 'hcaptcha.com', 'are you a robot')
+
+# Captcha pages are small, a full result page that merely embeds a captcha widget is not pushback
+CAPTCHA_MAX_CHARS = 100_000
+
+
+def domain_of(url):
+    """Host a URL is rate limited under (lowercase, without port and www.)"""
+    host = (urlparse(url).hostname or '') if '://' in url else url.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_throttled(status=None, html=None):
+    """True for 429/503 responses and captcha interstitials"""
+    if status in THROTTLE_STATUSES:
+        return True
+    if not html or len(html) > CAPTCHA_MAX_CHARS:
+        return False
+    text = html.lower()
+    return any(marker in text for marker in CAPTCHA_MARKERS)
+
+
+def retry_after_seconds(headers):
+    """Seconds from a Retry-After header (HTTP dates are ignored)"""
+    value = (headers or {}).get('Retry-After') or (headers or {}).get('retry-after')
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Bucket:
+    __slots__ = ('rate', 'tokens', 'updated', 'last_cut')
+
+    def __init__(self, rate, tokens):
+        self.rate = rate
+        self.tokens = tokens
+        self.updated = time.monotonic()
+        self.last_cut = 0.0
+
+
+class DomainRateLimiter:
+    """Token bucket per domain, rate raised additively on success and cut multiplicatively on pushback"""
+
+    def __init__(self, rate=0.5, burst=2, min_rate=0.05, max_rate=4.0, increase=0.05, decrease=0.5):
+        self.initial_rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.increase = increase
+        self.decrease = decrease
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, url):
+        """Take the next slot for url's domain, returns seconds to wait before using it"""
+        domain = domain_of(url)
+        with self._lock:
+            bucket = self._refill(domain)
+            bucket.tokens -= 1
+            # Going into debt queues the caller behind everyone already waiting
+            return max(0.0, -bucket.tokens / bucket.rate)
+
+    def acquire(self, url):
+        """Block the calling thread until url's domain has a slot, returns seconds waited"""
+        wait = self.reserve(url)
+        if wait:
+            time.sleep(wait)
+        RATE_LIMIT_WAIT.observe(wait, domain=domain_of(url))
+        return wait
+
+    async def acquire_async(self, url):
+        """Awaitable acquire, other tasks keep running while this one waits"""
+        wait = self.reserve(url)
+        if wait:
+            await asyncio.sleep(wait)
+        RATE_LIMIT_WAIT.observe(wait, domain=domain_of(url))
+        return wait
+
+    def report(self, url, status=None, html=None, headers=None, throttled=None):
+        """Adapt url's domain to a response (html None for a failed request), True if the site pushed back"""
+        if throttled is None:
+            throttled = is_throttled(status, html)
+        domain = domain_of(url)
+        with self._lock:
+            bucket = self._refill(domain)
+            now = time.monotonic()
+            if throttled:
+                # Requests already in flight fail together, cut once per interval at the old rate
+                if now - bucket.last_cut >= 1 / bucket.rate:
+                    bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                    bucket.last_cut = now
+                retry_after = retry_after_seconds(headers)
+                pause = retry_after * bucket.rate if retry_after else 0
+                bucket.tokens = min(bucket.tokens, 0) - pause
+            elif html is not None and (status is None or status < 400):
+                # Only a page that actually came back earns a faster rate, errors leave it as is
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+            rate = bucket.rate
+        DOMAIN_RATE.set(rate, domain=domain)
+        if throttled:
+            THROTTLED.inc(domain=domain)
+        return throttled
+
+    def rates(self):
+        """Current requests per second per domain"""
+        with self._lock:
+            return {domain: round(bucket.rate, 3) for domain, bucket in self._buckets.items()}
+
+    def _refill(self, domain):
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            bucket = self._buckets[domain] = _Bucket(self.initial_rate, self.burst)
+            return bucket
+        now = time.monotonic()
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+        bucket.updated = now
+        return bucket
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide limiter shared by every scraper and job (defaults from RATE_LIMIT_*)"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = DomainRateLimiter(
+                rate=float(os.environ.get('RATE_LIMIT_RPS', 0.5)),
+                burst=int(os.environ.get('RATE_LIMIT_BURST', 2)),
+                min_rate=float(os.environ.get('RATE_LIMIT_MIN_RPS', 0.05)),
+                max_rate=float(os.environ.get('RATE_LIMIT_MAX_RPS', 4)),
+            )
+        return _limiter
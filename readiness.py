@@ -0,0 +1,127 @@
+import time
+from functools import partial
+from urllib.parse import urlparse
+
+from load_profiles import network_log
+from metrics import READY_SECONDS, READY_TIMEOUTS
+
+POLL_INTERVAL = 0.1
+
+
+class SelectorPresent:
+    """Ready once an element matching a CSS selector is in the DOM"""
+
+    def __init__(self, selector):
+        self.name = 'selector'
+        self.selector = selector
+
+    def start(self, driver):
+        pass
+
+    def __call__(self, driver):
+        return driver.execute_script('return !!document.querySelector(arguments[0]);', self.selector)
+
+
+class DomStable:
+    """Ready once the number of elements has not changed for quiet seconds"""
+
+    def __init__(self, quiet=0.5):
+        self.name = 'dom_stable'
+        self.quiet = quiet
+
+    def start(self, driver):
+        self.count = None
+        self.changed = time.monotonic()
+
+    def __call__(self, driver):
+        count = driver.execute_script('return document.getElementsByTagName("*").length;')
+        now = time.monotonic()
+        if count != self.count:
+            self.count, self.changed = count, now
+            return False
+        return now - self.changed >= self.quiet
+
+
+class NetworkIdle:
+    """Ready once at most max_inflight requests have been open for idle seconds.
+
+    Requests are followed through Chrome's DevTools performance log
+    (goog:loggingPrefs), falling back to the page's resource timing
+    entries when the driver was started without it.
+    """
+
+    def __init__(self, idle=0.5, max_inflight=2):
+        self.name = 'network_idle'
+        self.idle = idle
+        self.max_inflight = max_inflight
+
+    def start(self, driver):
+        self.log = network_log(driver)
+        self.resources = None
+        self.quiet_since = None
+
+    def __call__(self, driver):
+        self.log.drain(driver)
+        if self.log.available:
+            busy = len(self.log.inflight) > self.max_inflight
+        else:
+            resources = driver.execute_script('return performance.getEntriesByType("resource").length;')
+            busy, self.resources = resources != self.resources, resources
+
+        now = time.monotonic()
+        if busy:
+            self.quiet_since = None
+            return False
+        if self.quiet_since is None:
+            self.quiet_since = now
+        return now - self.quiet_since >= self.idle
+
+
+# Conditions per kind of page, checked in order within one timeout
+PROFILES = {
+    'booking_search': [partial(SelectorPresent, '[data-testid="property-card"], .sr_item'), DomStable],
+    'booking_hotel': [partial(SelectorPresent, '#hp_hotel_name, .pp-header__title, [data-testid="title"]'),
+                      DomStable],
+    'google_search': [partial(SelectorPresent, '#search, #rso'), DomStable],
+    'maps_search': [partial(SelectorPresent, 'div[role="feed"], div[role="main"]'), NetworkIdle],
+    'maps_place': [partial(SelectorPresent, 'button[data-item-id], a[data-item-id]'), NetworkIdle],
+    'maps_listings': [partial(SelectorPresent, 'div[class*="section-result"]'), DomStable],
+    'maps_panel': [partial(SelectorPresent, 'div[class*="W4Efsd"]'), DomStable],
+    'default': [partial(SelectorPresent, 'body'), DomStable],
+}
+
+
+def profile_for(url):
+    """Readiness profile name for a page URL"""
+    parts = urlparse(url)
+    host = parts.netloc.lower()
+    if host.endswith('booking.com'):
+        return 'booking_search' if 'searchresults' in parts.path else 'booking_hotel'
+    if 'google.' in host and parts.path.startswith('/maps'):
+        return 'maps_place' if '/place/' in parts.path else 'maps_search'
+    if 'google.' in host and parts.path.startswith('/search'):
+        return 'google_search'
+    return 'default'
+
+
+def wait_ready(driver, profile, timeout=10):
+    """Poll profile's conditions in order until all hold, returns False if timeout ran out first"""
+    deadline = time.monotonic() + timeout
+    for make_condition in PROFILES.get(profile) or PROFILES['default']:
+        condition = make_condition()
+        started = time.monotonic()
+        condition.start(driver)
+        while True:
+            try:
+                ready = condition(driver)
+            except Exception:
+                ready = False  # page navigating away or script blocked, poll again
+            if ready:
+                READY_SECONDS.observe(time.monotonic() - started, profile=profile, condition=condition.name)
+                break
+            if time.monotonic() >= deadline:
+                READY_TIMEOUTS.inc(profile=profile, condition=condition.name)
+                READY_SECONDS.observe(time.monotonic() - started, profile=profile, condition=condition.name)
+                return False
+            time.sleep(POLL_INTERVAL)
+    return True
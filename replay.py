@@ -0,0 +1,237 @@
+"""Record real responses and replay them without network access.
+
+Usage: python replay.py serve [--dir DIR] [--port N] [--latency MIN-MAX] [--error-rate F] [--seed N]
+
+The server answers GET /replay?url=<original url> with the recorded page.
+Point the scraper at it with REPLAY_SERVER_URL=http://127.0.0.1:<port> and
+every page load, Chrome included, goes to the server instead of the site.
+FETCH_MODE=replay without REPLAY_SERVER_URL starts one in-process.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+from page_cache import normalize_url
+
+FETCH_MODES = ('live', 'record', 'replay')
+
+# Query parameters that change from run to run (dates, tracking ids), left out of the key
+VOLATILE_PARAMS = frozenset({'checkin', 'checkout', 'srpvid', 'sid', 'aid'})
+
+
+class RecordingStore:
+    """Recorded responses on disk, keyed by normalized URL"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, url):
+        """Recording for url as {'url', 'status', 'headers', 'via', 'recorded_at', 'body'}, or None"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return dict(meta, body=body)
+
+    def body(self, url):
+        recording = self.get(url)
+        return recording['body'] if recording else None
+
+    def put(self, url, body, status=200, headers=None, via='requests'):
+        if body is None:
+            return
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        suffix = f".{threading.get_ident()}.tmp"
+        with open(body_path + suffix, 'w', encoding='utf-8') as f:
+            f.write(body)
+        os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'status': status, 'headers': headers or {}, 'via': via,
+                       'recorded_at': time.time()}, f)
+        os.replace(meta_path + suffix, meta_path)
+
+    def urls(self):
+        """Original URLs of every recording"""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json'):
+                    try:
+                        with open(os.path.join(root, name), encoding='utf-8') as f:
+                            yield json.load(f)['url']
+                    except (OSError, ValueError, KeyError):
+                        continue
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def _paths(self, url):
+        key = hashlib.sha256(recording_key(url).encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + '.html', base + '.json'
+
+
+class ReplayServer:
+    """Local HTTP server serving recordings with configurable latency and error rate"""
+
+    def __init__(self, store, host='127.0.0.1', port=0, latency=(0.0, 0.0), error_rate=0.0, seed=None):
+        self.store = store
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rewrite(self, url):
+        return replay_url(self.url, url)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _draw(self):
+        """(delay, fail) for one request, drawn from the seeded generator"""
+        with self._random_lock:
+            return self._random.uniform(*self.latency), self._random.random() < self.error_rate
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                target = parse_qs(parts.query).get('url', [None])[0]
+                if parts.path != '/replay' or not target:
+                    return self._send(400, 'expected /replay?url=...')
+
+                delay, fail = server._draw()
+                time.sleep(delay)
+                if fail:
+                    return self._send(503, 'injected error')
+
+                recording = server.store.get(target)
+                if recording is None:
+                    return self._send(404, f'no recording for {target}')
+                self._send(recording.get('status') or 200, recording['body'])
+
+            def _send(self, status, body):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def recording_key(url):
+    """Normalized URL without VOLATILE_PARAMS, so a recording replays on any day"""
+    parts = urlsplit(normalize_url(url))
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in VOLATILE_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def replay_url(server_url, url):
+    """Address of url's recording on a replay server"""
+    return f"{server_url.rstrip('/')}/replay?url={quote(url, safe='')}"
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_recording_store(directory=None):
+    """Process-wide store per directory (defaults to RECORDINGS_DIR)"""
+    directory = os.path.abspath(directory or os.environ.get('RECORDINGS_DIR', '.recordings'))
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = RecordingStore(directory)
+        return _stores[directory]
+
+
+_servers = {}
+
+
+def get_replay_server(directory=None):
+    """In-process server for a recordings directory, started on a free port on first use"""
+    store = get_recording_store(directory)
+    with _stores_lock:
+        if store.directory not in _servers:
+            _servers[store.directory] = ReplayServer(store).start()
+        return _servers[store.directory]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['serve', 'list'])
+    parser.add_argument('--dir', default=None, help='recordings directory (default RECORDINGS_DIR or .recordings)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='0-0', help='seconds added per response, MIN-MAX')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 503')
+    parser.add_argument('--seed', type=int, default=None, help='seed for latency and errors (deterministic runs)')
+    args = parser.parse_args()
+
+    store = get_recording_store(args.dir)
+    if args.command == 'list':
+        for url in sorted(store.urls()):
+            print(url)
+        return
+
+    low, _, high = args.latency.partition('-')
+    latency = (float(low), float(high or low))
+    server = ReplayServer(store, args.host, args.port, latency, args.error_rate, args.seed)
+    print(f"Serving {store.directory} on {server.url} (set REPLAY_SERVER_URL={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
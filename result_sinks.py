@@ -0,0 +1,186 @@
+import csv
+import json
+import os
+import threading
+
+# Try importing pyarrow for the Parquet writer (optional)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Column order of every tabular output
+FIELDNAMES = [
+    'name', 'city', 'country', 'rating', 'price', 'price_amount',
+    'phone', 'email', 'website', 'address', 'url', 'source'
+]
+
+
+class ResultSink:
+    """Receives hotels one at a time while a scrape runs, safe to share between source threads"""
+
+    def __init__(self):
+        self.count = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def write(self, hotel):
+        with self._lock:
+            if self.closed:
+                raise ValueError("write to a closed sink")
+            if self._write(hotel) is not False:
+                self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self.closed:
+                self.closed = True
+                self._close()
+
+    def _write(self, hotel):
+        """Write one hotel, returning False if it was dropped"""
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvSink(ResultSink):
+    """Appends one CSV row per hotel, flushed so a crash keeps every row written so far"""
+
+    def __init__(self, path, fieldnames=FIELDNAMES):
+        super().__init__()
+        self.path = path
+        self.fieldnames = fieldnames
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+        self._file.flush()
+
+    def _write(self, hotel):
+        self._writer.writerow({field: hotel.get(field, '') for field in self.fieldnames})
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class NdjsonSink(ResultSink):
+    """One JSON document per line, flushed per hotel"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write(self, hotel):
+        self._file.write(json.dumps(hotel, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetSink(ResultSink):
+    """Buffers batch_size hotels and writes each batch as a Parquet row group"""
+
+    def __init__(self, path, batch_size=1000, fieldnames=FIELDNAMES):
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet output needs pyarrow, install with: pip install pyarrow")
+        super().__init__()
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.fieldnames = fieldnames
+        self.schema = pa.schema([(field, pa.float64() if field == 'rating' else pa.string())
+                                 for field in fieldnames])
+        self._rows = []
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def _write(self, hotel):
+        row = {}
+        for field in self.fieldnames:
+            value = hotel.get(field)
+            if value is not None and field != 'rating':
+                value = str(value)
+            row[field] = value
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def _close(self):
+        # The footer is only written here, a file from a crashed run is not readable
+        self._flush()
+        self._writer.close()
+
+
+class UniqueSink(ResultSink):
+    """Forwards only the first hotel per normalized name (or key(hotel)), keeps just the seen keys in memory"""
+
+    def __init__(self, sink, key=None):
+        super().__init__()
+        self.sink = sink
+        self.key = key or (lambda hotel: (hotel.get('name') or '').lower().strip())
+        self.dropped = 0
+        self._seen = set()
+
+    def _write(self, hotel):
+        key = self.key(hotel)
+        if key in self._seen:
+            self.dropped += 1
+            return False
+        self._seen.add(key)
+        self.sink.write(hotel)
+
+    def _close(self):
+        self.sink.close()
+
+
+class ListSink(ResultSink):
+    """Keeps every hotel in memory, for callers that post-process the whole result"""
+
+    def __init__(self):
+        super().__init__()
+        self.hotels = []
+
+    def _write(self, hotel):
+        self.hotels.append(hotel)
+
+
+class MultiSink(ResultSink):
+    """Fans every hotel out to several sinks"""
+
+    def __init__(self, sinks):
+        super().__init__()
+        self.sinks = list(sinks)
+
+    def _write(self, hotel):
+        for sink in self.sinks:
+            sink.write(hotel)
+
+    def _close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+SINKS = {'.csv': CsvSink, '.ndjson': NdjsonSink, '.jsonl': NdjsonSink, '.parquet': ParquetSink}
+
+
+def open_sink(path, **kwargs):
+    """Sink for path, picked by file extension (.csv, .ndjson/.jsonl, .parquet)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unknown output format {extension!r}, expected one of {tuple(SINKS)}")
+    return SINKS[extension](path, **kwargs)
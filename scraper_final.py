@@ -1,13 +1,37 @@
-import requests
-from bs4 import BeautifulSoup
 import time
-import csv
 import json
+import os
 import re
 from urllib.parse import quote, urlencode
 import random
 import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice
+
+from contact_scanner import best_phone
+from dedupe import remove_duplicates, website_domain
+from driver_pool import get_driver_pool
+from fetch_engine import AsyncFetchEngine, HostLimiter
+from hotel_store import get_hotel_store
+from html_parser import parse_html, resolve_backend
+from journal import hotel_key
+from load_profiles import apply_profile, bytes_saved, network_log
+from lookup_cache import MISSING, get_lookup_cache, lookup_key
+from maps_feed import (FEED_COUNT_SCRIPT, FEED_SCRIPT, FEED_SCROLL_SCRIPT, PANEL_SCRIPT, missing_fields,
+                       parse_listings, parse_panel)
+from metrics import BLOCKED_REQUESTS, BYTES_SAVED, PAGE_BYTES, PAGE_LOAD_SECONDS, timed
+from page_cache import get_page_cache
+from proxy_pool import get_proxy_manager
+from rate_limiter import get_rate_limiter
+from readiness import profile_for, wait_ready
+from replay import FETCH_MODES, get_recording_store, get_replay_server, replay_url
+from result_sinks import FIELDNAMES, CsvSink, NdjsonSink
+from selector_planner import get_selector_planner
+from website_resolver import LookupFailed, WebsiteResolver
 
 # Try importing Selenium (optional)
 try:
@@ -15,18 +39,83 @@ try:
     from selenium.webdriver.common.by import By
     from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
     from selenium.common.exceptions import TimeoutException
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
 
+# Seconds a single source may run inside scrape_all_sources
+DEFAULT_SOURCE_TIMEOUT = 300
+
+# Properties per Booking.com results page, and the offset past which it serves no more results
+BOOKING_PAGE_SIZE = 25
+BOOKING_MAX_OFFSET = 1000
+
+# Marks Chrome's network error page (ERR_PROXY_CONNECTION_FAILED, ERR_NAME_NOT_RESOLVED, ...)
+CHROME_ERROR_MARKER = 'id="main-frame-error"'
+
+# Google Maps listings whose place page may be opened for a missing phone or website
+MAX_MAPS_PANEL_FALLBACKS = 10
+
+class SourceFailed(Exception):
+    """A source that could not be scraped (search page failed, captcha), as opposed to one that found nothing"""
+
+
+class SourceSkipped(Exception):
+    """A source that does not run in this configuration (Google Maps without Selenium)"""
+
+
+class SourceStopped(Exception):
+    """A source told to stop (it timed out) while it was still running"""
+
+
+def booking_card_key(hotel):
+    """Identity of a Booking.com card across result pages (property URL without tracking parameters)"""
+    return hotel['url'].split('?')[0] or hotel['name']
+
 class AdvancedHotelScraper:
-    def __init__(self, delay_min=2, delay_max=5, use_selenium=True):
-        self.delay_min = delay_min
-        self.delay_max = delay_max
+    def __init__(self, use_selenium=True, per_host_limit=4, driver_pool_size=None,
+                 enrich_workers=4, source_timeouts=None, use_cache=True, cache_dir=None,
+                 parser_backend=None, use_store=True, store_path=None, enrich_ttl=None,
+                 use_proxies=True, fetch_mode=None, recordings_dir=None, replay_server=None,
+                 rate_limit=True, max_results=None, block_resources=None, use_lookup_cache=True,
+                 lookup_cache_path=None, journal=None, selector_planner=None):
+        self.enrich_workers = enrich_workers
+        # Cap on properties per source and search (Booking.com pages, Google Maps feed scrolling)
+        self.max_results = max_results or int(os.environ.get('BOOKING_MAX_RESULTS', 100))
+        self.source_timeouts = source_timeouts or {}
+        self.source_stats = {}
+        self.parser_backend = resolve_backend(parser_backend)
+        # Process-wide planner persisted to SELECTOR_STATS_PATH unless one is passed in
+        self.selector_planner = selector_planner or get_selector_planner()
+        self.sink = None
+        # Checkpoint journal (journal.Journal): finished pages, hotels and cities are skipped on resume
+        self.journal = journal
         self.use_selenium = use_selenium and SELENIUM_AVAILABLE
-        self.load_proxies()
+        
+        # Chrome skips images, fonts, trackers (and stylesheets where we only read HTML) per page kind
+        if block_resources is None:
+            block_resources = os.environ.get('CHROME_BLOCK_RESOURCES', '1') != '0'
+        self.block_resources = block_resources
+        self.load_stats = {}
+        self._load_stats_lock = threading.Lock()
+        
+        # live: normal fetching, record: also save every page, replay: serve saved pages only
+        self.fetch_mode = fetch_mode or os.environ.get('FETCH_MODE', 'live')
+        if self.fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode {self.fetch_mode!r}, expected one of {FETCH_MODES}")
+        self.recordings = get_recording_store(recordings_dir) if self.fetch_mode == 'record' else None
+        self.replay_server = replay_server or os.environ.get('REPLAY_SERVER_URL') or None
+        if self.fetch_mode == 'replay' and not self.replay_server:
+            self.replay_server = get_replay_server(recordings_dir).url
+        
+        # Replayed runs never leave the machine
+        self.proxy_manager = None
+        if use_proxies and not self.replay_server:
+            self.load_proxies()
+        
+        # Per-domain pacing shared by every scraper in the process, adapted to 429/503/captcha responses
+        self.rate_limiter = get_rate_limiter() if rate_limit and not self.replay_server else None
 
         # Set random user-agent
         self.random_user_agent = self.get_random_user_agent()
@@ -45,12 +134,47 @@ class AdvancedHotelScraper:
             'Cache-Control': 'max-age=0'
         }
 
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # Shared on-disk page cache (use_cache=False bypasses it entirely). Off while recording as
+        # well, every page a run needs has to be loaded to end up in the recordings
+        caching = use_cache and not self.replay_server and self.recordings is None
+        self.page_cache = get_page_cache(cache_dir) if caching else None
+        
+        # Hotels seen in earlier runs, detail pages are only re-fetched once enrich_ttl has passed. Off
+        # while recording (skipped detail pages would be missing) and replaying (keeps the live store clean)
+        storing = use_store and not self.replay_server and self.recordings is None
+        self.hotel_store = get_hotel_store(store_path, enrich_ttl) if storing else None
+        
+        # Google lookups by hotel name, city and country (knowledge-panel phones), misses expire sooner
+        caching = use_lookup_cache and not self.replay_server and self.recordings is None
+        self.lookup_cache = get_lookup_cache(lookup_cache_path) if caching else None
+        
+        # Official websites (and their phones) resolved on a few threads borrowing pooled browsers
+        self.website_resolver = WebsiteResolver(
+            self.search_official_website,
+            site_phone=self.scan_official_site,
+            cache=self.lookup_cache,
+            workers=int(os.environ.get('WEBSITE_RESOLVER_WORKERS', 2))
+        )
 
-        # Initialize Selenium if requested
+        # Async engine behind get_page_requests / fetch_pages
+        self.fetch_engine = AsyncFetchEngine(
+            self.headers,
+            proxy_picker=self.get_random_proxy,
+            proxy_reporter=self.report_proxy,
+            per_host_limit=per_host_limit,
+            cache=self.page_cache,
+            rate_limiter=self.rate_limiter
+        )
+
+        # Caps concurrent detail/fallback page loads per domain across threads
+        self.host_limiter = HostLimiter(per_host_limit)
+
+        # Borrow Chrome instances from the process-wide pool if requested
+        self._local = threading.local()
+        self._driver_owner = object()  # this scraper's job, as far as driver resets go
+        self.driver_pool = None
         if self.use_selenium:
-            self.driver = self.setup_selenium()
+            self.driver_pool = get_driver_pool(self.setup_selenium, size=driver_pool_size)
             
     def get_random_user_agent(self):
         user_agents = [
@@ -62,31 +186,23 @@ class AdvancedHotelScraper:
         return random.choice(user_agents)
             
     def load_proxies(self, proxy_source_url="https://free-proxy-list.net/"):
-        """Load free proxies from public proxy list"""
-        try:
-            print("Loading proxy list...")
-            res = requests.get(proxy_source_url, timeout=10)
-            soup = BeautifulSoup(res.text, 'html.parser')
-
-            proxy_list = []
-            for row in soup.select("table#proxylisttable tbody tr"):
-                cols = row.find_all("td")
-                if cols[6].text == "yes":  # HTTPS only
-                    ip = cols[0].text.strip()
-                    port = cols[1].text.strip()
-                    proxy_list.append(f"http://{ip}:{port}")
-            
-            self.proxies = proxy_list
-            print(f"Loaded {len(proxy_list)} proxies.")
-        except Exception as e:
-            print(f"Failed to load proxies: {e}")
-            self.proxies = []
+        """Attach the process-wide proxy manager (fetched once, then persisted to disk)"""
+        self.proxy_manager = get_proxy_manager(proxy_source_url)
+
+    @property
+    def proxies(self):
+        return self.proxy_manager.proxies if getattr(self, 'proxy_manager', None) else []
 
     def get_random_proxy(self):
-        """Get a random proxy from the list"""
-        if not hasattr(self, 'proxies') or not self.proxies:
+        """Get a proxy from the pool, weighted by success rate and latency"""
+        if not getattr(self, 'proxy_manager', None):
             return None
-        return random.choice(self.proxies)
+        return self.proxy_manager.choose()
+
+    def report_proxy(self, proxy, ok, latency=None):
+        """Feed request outcomes back into proxy scoring"""
+        if getattr(self, 'proxy_manager', None):
+            self.proxy_manager.report(proxy, ok, latency)
 
         
     def setup_selenium(self):
@@ -102,7 +218,7 @@ class AdvancedHotelScraper:
             # Set the same random user-agent as requests
             chrome_options.add_argument(f'--user-agent={self.random_user_agent}')
 
-            # Optional: use proxy for selenium
+            # Optional: use proxy for selenium (fixed for the driver's lifetime)
             proxy = self.get_random_proxy()
             if proxy:
                 chrome_options.add_argument(f'--proxy-server={proxy}')
@@ -114,128 +230,245 @@ class AdvancedHotelScraper:
             chrome_options.add_argument('--use-gl=swiftshader')
             chrome_options.add_argument('--ignore-gpu-blocklist')
 
+            # DevTools network events, read by the network-idle readiness check
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
             driver = webdriver.Chrome(options=chrome_options)
+            driver.proxy_server = proxy
             return driver
         except Exception as e:
             print(f"Failed to setup Selenium: {e}")
             return None
     
-    def random_delay(self):
-        """Add random delay between requests"""
-        delay = random.uniform(self.delay_min, self.delay_max)
-        time.sleep(delay)
+    @contextmanager
+    def borrow_driver(self):
+        """Borrow a WebDriver from the shared pool (re-entrant within a thread)"""
+        held = getattr(self._local, 'driver', None)
+        if held is not None or not self.driver_pool:
+            yield held
+            return
+
+        # Pages of one scraper (one job) share cookies, a driver last used by another job is reset first
+        driver = self.driver_pool.checkout(owner=self._driver_owner)
+        self._local.driver = driver
+        try:
+            yield driver
+        finally:
+            self._local.driver = None
+            self.driver_pool.checkin(driver)
+    
+    def report_driver(self, driver, ok):
+        """Score the proxy a driver was launched with, the pool retires drivers that keep failing"""
+        self.report_proxy(getattr(driver, 'proxy_server', None), ok)
+        if self.driver_pool and self.driver_pool.report(driver, ok):
+            print(f"Retiring WebDriver after {self.driver_pool.max_failures} failed page loads")
+    
+    def throttle(self, url):
+        """Wait for url's domain to allow another page load"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(url)
+    
+    def load_page(self, driver, url, profile=None, timeout=10):
+        """Navigate driver to url with profile's resource blocking and readiness wait, False if never ready"""
+        profile = profile or profile_for(url)
+        apply_profile(driver, profile if self.block_resources else None)
+        log = network_log(driver)
+        log.drain(driver)
+        bytes_before, blocked_before = log.snapshot()
+        
+        self.throttle(url)
+        started = time.perf_counter()
+        driver.get(self.page_url(url))
+        ready = wait_ready(driver, profile, timeout=timeout)
+        seconds = time.perf_counter() - started
+        
+        log.drain(driver)
+        bytes_after, blocked_after = log.snapshot()
+        self.record_load(profile, seconds, bytes_after - bytes_before, blocked_after - blocked_before)
+        return ready
+    
+    def record_load(self, profile, seconds, loaded_bytes, blocked):
+        """Account one browser page load: time, bytes transferred, requests blocked and bytes that saved"""
+        saved = bytes_saved(blocked)
+        PAGE_LOAD_SECONDS.observe(seconds, profile=profile, blocking='on' if self.block_resources else 'off')
+        PAGE_BYTES.observe(loaded_bytes, profile=profile)
+        BYTES_SAVED.inc(saved, profile=profile)
+        for kind, count in blocked.items():
+            BLOCKED_REQUESTS.inc(count, profile=profile, type=kind)
+        with self._load_stats_lock:
+            stats = self.load_stats.setdefault(profile, {'pages': 0, 'seconds': 0.0, 'bytes': 0,
+                                                         'blocked': 0, 'bytes_saved': 0})
+            stats['pages'] += 1
+            stats['seconds'] = round(stats['seconds'] + seconds, 3)
+            stats['bytes'] += loaded_bytes
+            stats['blocked'] += sum(blocked.values())
+            stats['bytes_saved'] += saved
+    
+    def report_page(self, url, html):
+        """Tell the rate limiter how a browser page load went, False for a captcha page"""
+        if not self.rate_limiter:
+            return True
+        return not self.rate_limiter.report(url, html=html)
     
-    def get_page_requests(self, url, retries=5):
+    def page_url(self, url):
+        """Where to load url from, the replay server's copy when one is configured"""
+        return replay_url(self.replay_server, url) if self.replay_server and url else url
+    
+    def record_page(self, url, html, via='requests'):
+        """Save a live page for later replay (FETCH_MODE=record)"""
+        if self.recordings is not None and html is not None:
+            self.recordings.put(url, html, via=via)
+    
+    @timed('fetch_requests', fail_on_none=True)
+    def get_page_requests(self, url, retries=5, bypass_cache=False):
         """Get page using requests with optional proxy"""
-        for attempt in range(retries):
-            proxy = self.get_random_proxy()
-            proxies = {"http": proxy, "https": proxy} if proxy else None
+        html = self.fetch_engine.fetch_sync(self.page_url(url), retries=retries, bypass_cache=bypass_cache)
+        self.record_page(url, html)
+        return html
 
-            try:
-                response = self.session.get(url, timeout=15, proxies=proxies)
-                response.raise_for_status()
-                return response.text
-            except Exception as e:
-                print(f"[Retry {attempt+1}] Failed with proxy {proxy}: {e}")
-                self.random_delay()
-        return None
+    def fetch_pages(self, urls, retries=5, bypass_cache=False):
+        """Fetch many pages concurrently, returns {url: html} (html is None on failure)"""
+        originals = {self.page_url(url): url for url in urls if url}
+        pages = self.fetch_engine.fetch_batch(list(originals), retries=retries, bypass_cache=bypass_cache)
+        results = {}
+        for loaded_url, html in pages.items():
+            results[originals[loaded_url]] = html
+            self.record_page(originals[loaded_url], html)
+        return results
+
+    async def afetch_pages(self, urls, retries=5, bypass_cache=False):
+        """Awaitable batch fetch, yields (url, html) pairs as they complete"""
+        originals = {self.page_url(url): url for url in urls if url}
+        async for loaded_url, html in self.fetch_engine.fetch_many(list(originals), retries, bypass_cache):
+            self.record_page(originals[loaded_url], html)
+            yield originals[loaded_url], html
     
-    def get_page_selenium(self, url, wait_time=10):
+    @timed('fetch_selenium', fail_on_none=True)
+    def get_page_selenium(self, url, wait_time=10, bypass_cache=False):
         """Get page using Selenium"""
-        if not self.driver:
-            return None
+        use_cache = self.page_cache and not bypass_cache
+        if use_cache:
+            html = self.page_cache.get(url)
+            if html is not None:
+                return html
         
-        try:
-            self.driver.get(url)
-            WebDriverWait(self.driver, wait_time).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            return self.driver.page_source
-        except Exception as e:
-            print(f"Selenium failed for {url}: {e}")
-            return None
+        with self.borrow_driver() as driver:
+            if not driver:
+                return None
+            
+            try:
+                # Read the page once its content has rendered, not as soon as <body> exists
+                if not self.load_page(driver, url, timeout=wait_time):
+                    print(f"{url} not ready after {wait_time}s, reading it as is")
+                html = driver.page_source
+                if CHROME_ERROR_MARKER in html:
+                    # Chrome's own error page (proxy down, DNS, connection refused), not the site
+                    print(f"Chrome could not load {url}")
+                    self.report_driver(driver, False)
+                    return None
+                if not self.report_page(url, html):
+                    print(f"Captcha page from {url}, backing off")
+                    self.report_driver(driver, False)
+                    return None
+                self.report_driver(driver, True)
+                if use_cache:
+                    self.page_cache.put(url, html)
+                self.record_page(url, html, via='selenium')
+                return html
+            except Exception as e:
+                print(f"Selenium failed for {url}: {e}")
+                self.report_driver(driver, False)
+                return None
+    
+    @timed('parse')
+    def parse_html(self, html):
+        """Parse a page with the configured backend (html.parser, lxml or selectolax)"""
+        return parse_html(html, self.parser_backend)
     
     def extract_phone_number(self, text):
-        """Extract phone number from text using regex"""
-        if not text:
+        """Most likely phone number in text (single pass, see contact_scanner)"""
+        return best_phone(text)
+    
+    def extract_price_amount(self, price_text):
+        """Extract numeric price amount from price text"""
+        if not price_text:
             return None
         
-        # Multiple phone number patterns
-        patterns = [
-            r'\+?[\d\s\-\(\)]{10,20}',  # International format
-            r'\(\d{3}\)\s?\d{3}-\d{4}',  # US format
-            r'\d{3}-\d{3}-\d{4}',       # US format
-            r'\d{10,}',                 # Simple digits
-        ]
+        # Remove currency symbols and extract numbers
+        price_clean = re.sub(r'[^\d.,]', '', price_text)
+        price_match = re.search(r'(\d+[.,]?\d*)', price_clean)
         
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group().strip()
+        if price_match:
+            return price_match.group(1).replace(',', '')
         return None
     
+    @timed('hotel_details', fail_on_none=True)
     def get_hotel_details(self, hotel_url, source, name=None, city=None, country=None):
-        """Get detailed hotel information from hotel page"""
+        """(details, complete) from the hotel page, details None if the page could not be loaded and
+        complete False if the Google fallback it needed could not be answered either"""
         if not hotel_url:
-            return {}
+            return None, False
         
         try:
-            html = self.get_page_selenium(hotel_url) if self.use_selenium else self.get_page_requests(hotel_url)
+            with self.host_limiter.limit(hotel_url):
+                html = self.get_page_selenium(hotel_url) if self.use_selenium else self.get_page_requests(hotel_url)
             if not html:
-                return {}
+                return None, False
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = self.parse_html(html)
             details = {}
             
             # Extract phone number
             phone_selectors = [
-                '[data-testid="phone-number"]',
-                '.phone-number',
-                '.hotel-phone',
-                '.contact-phone'
+                ('[data-testid="phone-number"]', '.phone-number', '.hotel-phone', '.contact-phone')
             ]
             
-            for selector in phone_selectors:
+            def phone_text(selector):
                 phone_elem = soup.select_one(selector)
-                if phone_elem:
-                    details['phone'] = self.extract_phone_number(phone_elem.get_text())
-                    break
+                return phone_elem.get_text() if phone_elem else None
+            
+            text = self.selector_planner.pick(source, 'detail', 'phone', phone_selectors, phone_text)
+            if text is not None:
+                details['phone'] = self.extract_phone_number(text)
             
             # Extract official website
             website_selectors = [
-                '[data-testid="website"]',
-                '.hotel-website',
-                '.official-website',
-                'a[href*="hotel"]'
+                ('[data-testid="website"]', '.hotel-website', '.official-website'),
+                'a[href*="hotel"]'  # catch-all, only when none of the above is on the page
             ]
             
-            for selector in website_selectors:
+            def website_href(selector):
                 website_elem = soup.select_one(selector)
                 if website_elem and 'href' in website_elem.attrs:
                     href = website_elem['href']
                     if href and not href.startswith(('http://booking.com', 'http://hotels.com', 'http://expedia.com')):
-                        details['website'] = href
-                        break
+                        return href
+                return None
+            
+            website = self.selector_planner.pick(source, 'detail', 'website', website_selectors, website_href)
+            if website:
+                details['website'] = website
             
             # Look for contact info in text
+            complete = True
             if not details.get('phone') and name and city and country:
                 print(f"🔁 Fallback: Getting contact from Google for {name}")
-                phone = self.get_contact_from_google_knowledge_panel(name, city, country)
+                try:
+                    phone = self.get_contact_from_google_knowledge_panel(name, city, country)
+                except LookupFailed as e:
+                    print(f"Google fallback failed for {name}: {e}")
+                    phone, complete = None, False
                 if phone:
                     details['phone'] = phone
             
-            return details
+            return details, complete
             
         except Exception as e:
             print(f"Error getting hotel details: {e}")
-            return {}
+            return None, False
     
-    def scrape_booking_com(self, city, country, min_rating=None):
-        """Scrape Booking.com for hotels"""
-        print(f"\nScraping Booking.com for hotels in {city}, {country}")
-        hotels = []
-        
-        # Booking.com search URL
+    def booking_search_url(self, city, country, offset=0):
+        """Booking.com search results URL, offset is the index of the first result on the page"""
         checkin = datetime.now().strftime('%Y-%m-%d')
         checkout = datetime.now().strftime('%Y-%m-%d')
         
@@ -247,263 +480,525 @@ class AdvancedHotelScraper:
             'group_children': '0',
             'no_rooms': '1'
         }
+        if offset:
+            params['offset'] = str(offset)
         
-        url = f"https://www.booking.com/searchresults.html?{urlencode(params)}"
+        return f"https://www.booking.com/searchresults.html?{urlencode(params)}"
+    
+    def scrape_booking_com(self, city, country, min_rating=None, max_results=None, offset=0):
+        """Scrape Booking.com for hotels"""
+        print(f"\nScraping Booking.com for hotels in {city}, {country}")
+        return list(self.iter_booking_com(city, country, min_rating, max_results, offset))
+    
+    def iter_booking_com(self, city, country, min_rating=None, max_results=None, offset=0):
+        """Yield enriched Booking.com hotels page by page, loading the next pages while one is enriched"""
+        max_results = max_results or self.max_results
+        offsets = iter(range(offset, BOOKING_MAX_OFFSET, BOOKING_PAGE_SIZE))
+        window = max(1, min(self.host_limiter.per_host_limit, -(-max_results // BOOKING_PAGE_SIZE)))
         
-        # Try both methods
-        html = self.get_page_selenium(url) if self.use_selenium else self.get_page_requests(url)
+        def load(page_offset):
+            url = self.booking_search_url(city, country, page_offset)
+            with self.host_limiter.limit(url):
+                return self.get_page_selenium(url) if self.use_selenium else self.get_page_requests(url)
         
-        if not html:
-            return hotels
+        def submit(page_offset):
+            # Pages an interrupted run finished come back from the journal as their hotels
+            done = self.journal.page(city, country, 'Booking.com', page_offset) if self.journal else None
+            if done is None:
+                return page_offset, executor.submit(load, page_offset)
+            future = Future()
+            future.set_result(done)
+            return page_offset, future
         
-        soup = BeautifulSoup(html, 'html.parser')
+        seen = set()
+        found = pages = 0
+        executor = ThreadPoolExecutor(max_workers=window)
+        try:
+            pending = deque(submit(page_offset) for page_offset in islice(offsets, window))
+            while pending:
+                page_offset, future = pending.popleft()
+                page = future.result()
+                if isinstance(page, dict):
+                    seen.update(page['keys'])
+                    cards = [hotel for hotel in map(self.journal.hotel, page['hotels']) if hotel]
+                else:
+                    if page is None and not pages:
+                        # Without its first page the search never ran, the city must not look done
+                        raise SourceFailed(f"Booking.com search for {city}, {country} did not load")
+                    cards = self.parse_booking_page(page, city, country, seen) if page else []
+                    if not cards:
+                        break  # failed page, past the last page, or only properties already seen
+                    page_keys = [booking_card_key(hotel) for hotel in cards]
+                
+                if min_rating:
+                    cards = [hotel for hotel in cards if not (hotel['rating'] and hotel['rating'] < min_rating)]
+                cards = cards[:max_results - found]
+                found += len(cards)
+                pages += 1
+                
+                # Keep as many pages in flight as the cap still needs at the yield seen so far
+                remaining = max_results - found
+                if remaining > 0:
+                    needed = -(-remaining // max(1, found // pages))
+                    next_offset = next(offsets, None) if len(pending) < min(window, needed) else None
+                    if next_offset is not None:
+                        pending.append(submit(next_offset))
+                
+                if isinstance(page, dict):
+                    for hotel in cards:
+                        self.emit(hotel)
+                        yield hotel
+                else:
+                    # Fetch detail pages concurrently, merged back in card order
+                    yield from self.enrich_hotels(cards)
+                    if self.journal:
+                        self.journal.record_page(city, country, 'Booking.com', page_offset, page_keys, cards)
+                if not remaining:
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def parse_booking_page(self, html, city, country, seen):
+        """Property cards on a search results page not in seen (card URLs, updated in place)"""
+        soup = self.parse_html(html)
         
-        # Multiple selectors for different layouts
+        # One selector per layout, then looser fallbacks
         selectors = [
-            'div[data-testid="property-card"]',
-            '.sr_item',
+            ('div[data-testid="property-card"]', '.sr_item'),
             '[data-testid="property-card"]',
             '.sr_item_content'
         ]
         
-        for selector in selectors:
-            elements = soup.select(selector)
-            if elements:
-                break
+        layout, elements = self.selector_planner.pick_with_selector(
+            'Booking.com', 'search', 'card', selectors, lambda selector: soup.select(selector) or None
+        )
         
-        for element in elements[:20]:  # Limit to first 20 results
+        cards = []
+        for element in elements or []:
             try:
-                # Extract hotel name
-                name_selectors = [
-                    '[data-testid="title"]',
-                    '.sr-hotel__name',
-                    'h3 a',
-                    '.fcab3ed991.a23c043802'
-                ]
-                
-                name = None
-                for name_sel in name_selectors:
-                    name_elem = element.select_one(name_sel)
-                    if name_elem:
-                        name = name_elem.get_text(strip=True)
-                        break
-                
-                if not name:
-                    continue
-                
-                # Extract rating
-                rating_selectors = [
-                    '[data-testid="review-score"] div',
-                    '.bui-review-score__badge',
-                    '.review-score-badge'
-                ]
-                
-                rating = None
-                for rating_sel in rating_selectors:
-                    rating_elem = element.select_one(rating_sel)
-                    if rating_elem:
-                        rating_text = rating_elem.get_text(strip=True)
-                        rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                        if rating_match:
-                            rating = float(rating_match.group(1))
-                            break
-                
-                # Extract price
-                price_selectors = [
-                    '[data-testid="price-and-discounted-price"]',
-                    '.bui-price-display__value',
-                    '.prco-valign-middle-helper'
-                ]
-                
-                price = None
-                price_amount = None
-                for price_sel in price_selectors:
-                    price_elem = element.select_one(price_sel)
-                    if price_elem:
-                        price = price_elem.get_text(strip=True)
-                        price_amount = self.extract_price_amount(price)
-                        break
-                
-                # Extract URL
-                url_elem = element.select_one('a[href]')
-                hotel_url = url_elem['href'] if url_elem else ''
-                if hotel_url and not hotel_url.startswith('http'):
-                    hotel_url = 'https://www.booking.com' + hotel_url
-                
-                # Filter by rating if specified
-                if min_rating and rating and rating < min_rating:
-                    continue
-                
-                # Get additional details
-                details = self.get_hotel_details(hotel_url, 'Booking.com', name=name, city=city, country=country)
-                
-                hotel = {
-                    'name': name,
-                    'rating': rating,
-                    'price': price,
-                    'price_amount': price_amount,
-                    'url': hotel_url,
-                    'source': 'Booking.com',
-                    'city': city,
-                    'country': country,
-                    'phone': details.get('phone'),
-                    'email': details.get('email'),
-                    'website': details.get('website')
-                }
-                
-                hotels.append(hotel)
-                
+                hotel = self.parse_booking_card(element, city, country, layout=layout)
             except Exception as e:
                 print(f"Error parsing Booking.com result: {e}")
                 continue
+            if not hotel:
+                continue
+            key = booking_card_key(hotel)
+            if key not in seen:
+                seen.add(key)
+                cards.append(hotel)
+        return cards
+    
+    def parse_booking_card(self, element, city, country, min_rating=None, layout=None):
+        """Parse one Booking.com property card (without detail page enrichment)"""
+        planner = self.selector_planner
+        
+        def text_of(selector):
+            elem = element.select_one(selector)
+            return elem.get_text(strip=True) if elem else None
+        
+        # Extract hotel name
+        name_selectors = [
+            ('[data-testid="title"]', '.sr-hotel__name'),
+            'h3 a',
+            '.fcab3ed991.a23c043802'
+        ]
+        
+        name = planner.pick('Booking.com', layout, 'name', name_selectors, text_of)
+        
+        if not name:
+            return None
+        
+        # Extract rating
+        rating_selectors = [
+            ('[data-testid="review-score"] div', '.bui-review-score__badge', '.review-score-badge')
+        ]
+        
+        def rating_of(selector):
+            rating_text = text_of(selector)
+            rating_match = re.search(r'(\d+\.?\d*)', rating_text) if rating_text else None
+            return float(rating_match.group(1)) if rating_match else None
+        
+        rating = planner.pick('Booking.com', layout, 'rating', rating_selectors, rating_of)
+        
+        # Extract price
+        price_selectors = [
+            ('[data-testid="price-and-discounted-price"]', '.bui-price-display__value', '.prco-valign-middle-helper')
+        ]
+        
+        price = planner.pick('Booking.com', layout, 'price', price_selectors, text_of)
+        price_amount = self.extract_price_amount(price)
+        
+        # Extract URL
+        url_elem = element.select_one('a[href]')
+        hotel_url = url_elem['href'] if url_elem else ''
+        if hotel_url and not hotel_url.startswith('http'):
+            hotel_url = 'https://www.booking.com' + hotel_url
+        
+        # Filter by rating if specified
+        if min_rating and rating and rating < min_rating:
+            return None
+        
+        return {
+            'name': name,
+            'rating': rating,
+            'price': price,
+            'price_amount': price_amount,
+            'url': hotel_url,
+            'source': 'Booking.com',
+            'city': city,
+            'country': country
+        }
+    
+    @timed('enrich')
+    def enrich_hotels(self, hotels):
+        """Add phone/email/website from detail pages on a bounded thread pool"""
+        if not hotels:
+            return hotels
+        
+        def enrich(hotel):
+            # Hotels an interrupted run already finished come back from the journal
+            journaled = self.journal.hotel(hotel_key(hotel)) if self.journal else None
+            if journaled is not None:
+                return journaled, False
+            # Recently enriched hotels skip the detail page and the Google fallback
+            stored = self.hotel_store.fresh_details(hotel) if self.hotel_store else None
+            if stored is not None:
+                return stored, False
+            try:
+                details, complete = self.get_hotel_details(hotel['url'], hotel['source'], name=hotel['name'],
+                                                           city=hotel['city'], country=hotel['country'])
+            except Exception as e:
+                print(f"Error enriching {hotel['name']}: {e}")
+                details, complete = None, False
+            # A page that loaded is enriched even with nothing on it, failed fetches (the detail page,
+            # or a Google fallback that hit a captcha or never finished loading) are retried next run
+            return details or {}, details is not None and complete
+        
+        executor = ThreadPoolExecutor(max_workers=self.enrich_workers)
+        try:
+            futures = [executor.submit(enrich, hotel) for hotel in hotels]
+            for hotel, future in zip(hotels, futures):
+                details, enriched = future.result()
+                hotel['phone'] = details.get('phone')
+                hotel['email'] = details.get('email')
+                hotel['website'] = details.get('website')
+                self.emit(hotel, enriched=enriched)
+        finally:
+            # A stopped source leaves the detail pages it has not started unloaded
+            executor.shutdown(cancel_futures=True)
         
-        self.random_delay()
         return hotels
     
+    def emit(self, hotel, enriched=False):
+        """Record a finished hotel in the journal and store and hand it to the sink of the running scrape"""
+        # Sources run on their own threads, one that timed out must not write into a later city's sink
+        stop = getattr(self._local, 'stop', None)
+        if stop is not None and stop.is_set():
+            raise SourceStopped("stopped after its timeout")
+        if self.journal and not self.journal.has_hotel(hotel):
+            self.journal.record_hotel(hotel)
+        if self.hotel_store:
+            try:
+                self.hotel_store.record(hotel, enriched=enriched)
+            except Exception as e:
+                print(f"Failed to store {hotel.get('name')}: {e}")
+        sink = getattr(self._local, 'sink', self.sink)
+        if sink is not None:
+            sink.write(hotel)
+    
     def scrape_google_maps_hotels(self, city, country, min_rating=None):
+        return list(self.iter_google_maps_hotels(city, country, min_rating))
+    
+    def iter_google_maps_hotels(self, city, country, min_rating=None):
+        """Yield Google Maps hotels as each one is finished"""
+        done = self.journal.page(city, country, 'Google Maps') if self.journal else None
+        if done is not None:
+            for hotel in map(self.journal.hotel, done['hotels']):
+                if hotel:
+                    self.emit(hotel)
+                    yield hotel
+            return
+        
+        if not self.driver_pool:
+            raise SourceSkipped("Google Maps scraping needs Selenium")
+        with self.borrow_driver() as driver:
+            if not driver:
+                raise SourceFailed("no WebDriver available for Google Maps")
+            yield from self._scrape_google_maps_with(driver, city, country, min_rating)
+
+    def _scrape_google_maps_with(self, driver, city, country, min_rating=None):
         query = f"hotels in {city} {country}"
         url = f"https://www.google.com/maps/search/{quote(query)}"
         print(f"Navigating to {url}")
-        self.driver.get(url)
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//div[@aria-label="Results for"]'))
-        )
-        time.sleep(2)
+        self.load_page(driver, url, 'maps_search')
+        html = driver.page_source
+        if CHROME_ERROR_MARKER in html or not self.report_page(url, html):
+            self.report_driver(driver, False)
+            raise SourceFailed(f"Google Maps search for {city}, {country} did not load (network error or captcha)")
+        self.record_page(url, html, via='selenium')
+
+        # Every listing in the feed from one script call, panels are only opened for missing fields
+        self.scroll_maps_feed(driver)
+        hotels = parse_listings(driver.execute_script(FEED_SCRIPT), city, country)
+        if not hotels:
+            print("No results feed found, falling back to opening each listing")
+            yield from self._scrape_google_maps_by_clicking(driver, city, country)
+            return
 
+        # min_rating is a Booking.com review score (1-10), Google Maps rates in stars (1-5)
+        if min_rating:
+            min_stars = min_rating / 2
+            hotels = [hotel for hotel in hotels if not (hotel['rating'] and hotel['rating'] < min_stars)]
+
+        fallbacks = 0
+        for hotel in hotels:
+            if missing_fields(hotel) and hotel['url'] and fallbacks < MAX_MAPS_PANEL_FALLBACKS:
+                fallbacks += 1
+                self.fill_from_maps_panel(driver, hotel)
+            self.emit(hotel)
+            yield hotel
+        if self.journal:
+            self.journal.record_page(city, country, 'Google Maps', 0, [hotel['name'] for hotel in hotels], hotels)
+
+    def scroll_maps_feed(self, driver, max_listings=None, timeout=3):
+        """Scroll the results feed until Maps stops loading listings (or max_listings are loaded)"""
+        max_listings = max_listings or self.max_results
+        count = driver.execute_script(FEED_COUNT_SCRIPT)
+        while count < max_listings:
+            if driver.execute_script(FEED_SCROLL_SCRIPT):
+                break
+            try:
+                WebDriverWait(driver, timeout).until(lambda d: d.execute_script(FEED_COUNT_SCRIPT) > count)
+            except TimeoutException:
+                break
+            count = driver.execute_script(FEED_COUNT_SCRIPT)
+
+    def fill_from_maps_panel(self, driver, hotel):
+        """Open a listing's place page and read the fields the feed card lacked"""
+        try:
+            self.load_page(driver, hotel['url'], 'maps_place')
+            parse_panel(driver.execute_script(PANEL_SCRIPT), hotel)
+        except Exception as e:
+            print(f"Could not open the Maps panel for {hotel['name']}: {e}")
+        return hotel
+
+    def _scrape_google_maps_by_clicking(self, driver, city, country):
+        """Old layout without a results feed: click each listing and read its panel"""
         hotels = []
-        listings = self.driver.find_elements(By.XPATH, '//div[contains(@class,"section-result")]')[:10]
+        listings = driver.find_elements(By.XPATH, '//div[contains(@class,"section-result")]')[:10]
 
         for listing in listings:
             try:
                 name = listing.find_element(By.TAG_NAME, 'h3').text
                 listing.click()
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, '//div[contains(@class,"W4Efsd")]'))
-                )
-                time.sleep(1)
+                wait_ready(driver, 'maps_panel')
 
                 # Extract contact from info panel
                 contact = None
-                # info_elements = self.driver.find_elements(By.CLASS_NAME, 'W4Efsd')
-                phone_elements = self.driver.find_elements(By.CSS_SELECTOR, '.Io6YTe.fontBodyMedium.kR99db.fdkmkc')
+                # info_elements = driver.find_elements(By.CLASS_NAME, 'W4Efsd')
+                phone_elements = driver.find_elements(By.CSS_SELECTOR, '.Io6YTe.fontBodyMedium.kR99db.fdkmkc')
                 for elem in phone_elements:
                     contact = self.extract_phone_number(elem.text)
                     if contact:
                         print("Found phone:", contact)
                         break
 
-                hotels.append({
+                hotel = {
                     'name': name,
                     'city': city,
                     'country': country,
                     'source': 'Google Maps',
                     'contact': contact
-                })
-                self.driver.back()
-                time.sleep(1)
+                }
+                hotels.append(hotel)
+                self.emit(hotel)
+                driver.back()
+                wait_ready(driver, 'maps_listings')
 
             except Exception as e:
                 print(f"Error scraping hotel: {e}")
                 continue
 
-        self.random_delay()
         return hotels
 
+    @timed('google_fallback')
     def get_contact_from_google_knowledge_panel(self, hotel_name, city, country):
+        """Phone from the hotel's Google Maps panel, found numbers and misses both kept in the lookup cache.
+
+        Raises LookupFailed when the panel could not be read (no driver, captcha, never finished loading).
+        """
+        key = lookup_key(hotel_name, city, country)
+        if self.lookup_cache:
+            cached = self.lookup_cache.get('panel_phone', key)
+            if cached is not MISSING:
+                return cached
+        
         print(f"DEBUG: Called get_contact_from_google_knowledge_panel for {hotel_name}, {city}, {country}")
         # self.open_hotel_in_google_maps(hotel_name)
         query = f"{hotel_name}"
         url = f"https://www.google.com/maps/search/{quote(query)}"
         print(f"DEBUG: Navigating to {url}")
-        try:
-            self.driver.get(url)
-            WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(random.uniform(2, 4))
-
-            html = self.driver.execute_script("return document.documentElement.innerText;")
-            phone_elements = self.driver.find_elements(By.CSS_SELECTOR, '.Io6YTe.fontBodyMedium.kR99db.fdkmkc')
-            for elem in phone_elements:
-                print("DEBUG: Phone element text:", elem.text)
-                phone = self.extract_phone_number(elem.text)
-                if phone:
-                    print("Found phone:", phone)
-                    break
+        with self.host_limiter.limit(url), self.borrow_driver() as driver:
+            if not driver:
+                raise LookupFailed("no WebDriver available")
+            try:
+                ready = self.load_page(driver, url, 'maps_search')
+                if not self.report_page(url, driver.page_source):
+                    print(f"Captcha page from {url}, backing off")
+                    raise LookupFailed(f"captcha page from {url}")
+                self.record_page(url, driver.page_source, via='selenium')
 
-            # Look for phone patterns
-            for pattern in [r"\+?1?\s?\(?\d{3}\)?[\s\-]\d{3}[\s\-]\d{4}", r"\d{3}[\s\-]\d{3}[\s\-]\d{4}"]:
-                m = re.search(pattern, html)
-                if m:
-                    return m.group(0)
+                html = driver.execute_script("return document.documentElement.innerText;")
+                phone_elements = driver.find_elements(By.CSS_SELECTOR, '.Io6YTe.fontBodyMedium.kR99db.fdkmkc')
+                for elem in phone_elements:
+                    print("DEBUG: Phone element text:", elem.text)
+                    phone = self.extract_phone_number(elem.text)
+                    if phone:
+                        print("Found phone:", phone)
+                        break
+                else:
+                    # Look for North American numbers anywhere in the panel text
+                    phone = best_phone(html, kinds=('nanp',))
 
-            return None
+                # "No phone" is only worth remembering from a panel that finished loading
+                if not (phone or ready):
+                    raise LookupFailed(f"{url} did not finish loading")
+                if self.lookup_cache:
+                    self.lookup_cache.put('panel_phone', key, phone)
+                return phone
 
-        except Exception as e:
-            print("Error in Google search:", e)
-            return None
+            except LookupFailed:
+                raise
+            except Exception as e:
+                print("Error in Google search:", e)
+                raise LookupFailed(str(e)) from e
 
     
     
-    def scrape_all_sources(self, city, country, min_rating=None):
-        """Scrape all available sources"""
+    def scrape_all_sources(self, city, country, min_rating=None, sink=None, collect=True):
+        """Scrape all available sources concurrently, merging results as each finishes"""
         all_hotels = []
+        self.source_stats = {}
+        # Hotels go to sink as each one completes, collect=False only streams them (flat memory)
+        self.sink = sink
+        
+        # A city finished before a restart is replayed from the journal without touching the network
+        if self.journal and self.journal.city_done(city, country):
+            resumed = self.journal.hotels(city, country)
+            for hotel in resumed:
+                if sink is not None:
+                    sink.write(hotel)
+                if collect:
+                    all_hotels.append(hotel)
+            self.source_stats = {'journal': {'status': 'resumed', 'hotels': len(resumed), 'seconds': 0}}
+            self.sink = None
+            return all_hotels
         
-        # List of scraping methods
-        methods = [
-            self.scrape_booking_com,
-            self.scrape_google_maps_hotels
+        # Sources by name, each yields its hotels as they finish
+        sources = {
+            'scrape_booking_com': self.iter_booking_com,
+            'scrape_google_maps_hotels': self.iter_google_maps_hotels
             # You can add more sources here
-        ]
+        }
         
-        for method in methods:
-            try:
-                hotels = method(city, country, min_rating)
-                if hotels:
-                    all_hotels.extend(hotels)
-                    print(f"Found {len(hotels)} hotels from {method.__name__}")
-            except Exception as e:
-                print(f"Error with {method.__name__}: {e}")
-                continue
+        # Each source runs on its own thread, so it borrows its own driver/session
+        executor = ThreadPoolExecutor(max_workers=len(sources))
+        started = time.time()
+        stops = {name: threading.Event() for name in sources}
+        futures = {executor.submit(self._run_source, name, source, city, country, min_rating, collect,
+                                   stops[name]): name
+                   for name, source in sources.items()}
+        deadlines = {future: started + self.source_timeouts.get(name, DEFAULT_SOURCE_TIMEOUT)
+                     for future, name in futures.items()}
         
-        self.random_delay()
+        pending = set(futures)
+        while pending:
+            now = time.time()
+            for future in [f for f in pending if deadlines[f] <= now]:
+                pending.discard(future)
+                future.cancel()
+                name = futures[future]
+                # A running source only notices at its next hotel, and drops that one
+                stops[name].set()
+                print(f"Timed out waiting for {name}")
+                self.source_stats[name] = {'status': 'timeout', 'hotels': 0,
+                                           'seconds': round(now - started, 2)}
+            if not pending:
+                break
+            
+            done, pending = wait(pending, timeout=min(deadlines[f] for f in pending) - now,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                hotels, stats = future.result()
+                self.source_stats[futures[future]] = stats
+                all_hotels.extend(hotels)
+        
+        # Don't block on sources that timed out, their threads wind down in the background
+        executor.shutdown(wait=False)
+        # Only a city every source got through, with hotels to show for it, counts as done (batch.py
+        # lists an empty city as failed), anything else is scraped again on resume
+        statuses = [stats['status'] for stats in self.source_stats.values()]
+        found = sum(stats['hotels'] for stats in self.source_stats.values())
+        if (self.journal and found and 'ok' in statuses
+                and all(status in ('ok', 'skipped') for status in statuses)):
+            self.journal.record_city(city, country)
+        self.sink = None
+        self.selector_planner.save()
         return all_hotels
     
+    def _run_source(self, name, source, city, country, min_rating, collect=True, stop=None):
+        """Drain one source's hotel iterator until stop is set, returning (hotels, stats), hotels only kept if collect"""
+        started = time.time()
+        hotels = []
+        count = 0
+        # This thread's hotels go to this scrape's sink, even once the next scrape has replaced self.sink
+        self._local.sink = self.sink
+        self._local.stop = stop
+        hotel_iterator = iter(())
+        try:
+            hotel_iterator = iter(source(city, country, min_rating))
+            for hotel in hotel_iterator:
+                if stop is not None and stop.is_set():
+                    raise SourceStopped("stopped after its timeout")
+                count += 1
+                if collect:
+                    hotels.append(hotel)
+            status = 'ok'
+            print(f"Found {count} hotels from {name}")
+        except SourceStopped:
+            print(f"Stopped {name} after {count} hotels, it ran past its timeout")
+            status = 'timeout'
+        except SourceSkipped as e:
+            print(f"Skipping {name}: {e}")
+            status = 'skipped'
+        except Exception as e:
+            print(f"Error with {name}: {e}")
+            status = 'error'
+        finally:
+            # Closing a generator runs its finally blocks, which shut down its page and detail threads
+            if hasattr(hotel_iterator, 'close'):
+                hotel_iterator.close()
+            self._local.sink = self._local.stop = None
+        return hotels, {'status': status, 'hotels': count, 'seconds': round(time.time() - started, 2)}
+    
     def remove_duplicates(self, hotels):
-        """Remove duplicate hotels based on name similarity"""
-        unique_hotels = []
-        seen_names = set()
-        
-        for hotel in hotels:
-            name_lower = hotel['name'].lower().strip()
-            # Simple duplicate detection
-            if name_lower not in seen_names:
-                seen_names.add(name_lower)
-                unique_hotels.append(hotel)
-        
-        return unique_hotels
+        """Merge duplicate hotels across sources (fuzzy name, phone and website matching)"""
+        return remove_duplicates(hotels)
     
+    @timed('save_csv')
     def save_to_csv(self, hotels, filename):
         """Save hotels to CSV with all fields"""
         if not hotels:
             print("No hotels to save")
             return
         
-        # Define the field order
-        fieldnames = [
-            'name', 'city', 'country', 'rating', 'price', 'price_amount',
-            'phone', 'email', 'website', 'url', 'source'
-        ]
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
+        with CsvSink(filename, FIELDNAMES) as sink:
             for hotel in hotels:
-                # Ensure all fields are present
-                row = {field: hotel.get(field, '') for field in fieldnames}
-                writer.writerow(row)
+                sink.write(hotel)
         
         print(f"Data saved to {filename}")
     
+    @timed('save_json')
     def save_to_json(self, hotels, filename):
         """Save hotels to JSON"""
         with open(filename, 'w', encoding='utf-8') as jsonfile:
@@ -511,45 +1006,65 @@ class AdvancedHotelScraper:
         
         print(f"Data saved to {filename}")
     
-    def cleanup(self):
-        """Clean up resources"""
-        if hasattr(self, 'driver') and self.driver:
-            self.driver.quit()
+    @timed('save_ndjson')
+    def save_to_ndjson(self, hotels, filename):
+        """Save hotels to newline-delimited JSON, one hotel per line"""
+        with NdjsonSink(filename) as sink:
+            for hotel in hotels:
+                sink.write(hotel)
+        
+        print(f"Data saved to {filename}")
+    
+    def cleanup(self, shutdown_pool=False):
+        """Clean up resources (pooled drivers stay warm unless shutdown_pool is set)"""
+        self.website_resolver.shutdown()
+        self.fetch_engine.close()
+        if shutdown_pool and self.driver_pool:
+            self.driver_pool.shutdown()
             
             
     def get_official_website_from_google(self, name, city, country):
+        """Official website of a hotel, through the resolver's cache and in-flight lookups"""
+        return self.website_resolver.resolve(name, city, country)
+    
+    def fill_official_websites(self, hotels):
+        """Resolve every hotel without a website in one batch (a whole city at once), returns hotels"""
+        missing = [hotel for hotel in hotels if not hotel.get('website')]
+        for hotel, website in zip(missing, self.website_resolver.resolve_many(missing)):
+            hotel['website'] = website
+        return hotels
+    
+    @timed('website_search')
+    def search_official_website(self, name, city, country):
+        """First organic Google result that is not a booking/review site, raises LookupFailed without a SERP"""
         query = quote(f"{name} {city} {country} official site")
         url = f"https://www.google.com/search?q={query}"
         html = self.get_page_selenium(url)
         if not html:
-            return None
-
-        soup = BeautifulSoup(html, 'html.parser')
+            raise LookupFailed(f"no results page for {url}")
 
-        # Try headline result
-        for a in soup.select("a[jsname='UWckNb']"):
-            href = a.get("href", "")
-            if href.startswith("http") and "google.com" not in href:
-                return href
+        soup = self.parse_html(html)
 
-        # Fallback
-        for a in soup.select("div.yuRUbf a[href]"):
+        # Headline result first, then the plain organic results
+        for a in soup.select("a[jsname='UWckNb'], div.yuRUbf a[href]"):
             href = a.get("href", "")
-            if href.startswith("http") and "google.com" not in href:
+            if href.startswith("http") and website_domain(href):
                 return href
-            
-        self.random_delay()
         return None
     
-    
     def get_phone_from_official_site(self, website_url):
-        html = self.get_page_selenium(website_url)
+        """Phone listed on a hotel's own site, cached per site"""
+        return self.website_resolver.submit_phone(website_url).result()
+    
+    def scan_official_site(self, website_url):
+        """Phone from a site's contact page (or home page), raises LookupFailed if the site did not load"""
+        html = self.get_page_selenium(website_url) if self.use_selenium else self.get_page_requests(website_url)
         if not html:
-            return None
-        soup = BeautifulSoup(html, 'html.parser')
+            raise LookupFailed(f"{website_url} did not load")
+        soup = self.parse_html(html)
 
         # Look for contact link
-        for a in soup.find_all('a', href=True):
+        for a in soup.select('a[href]'):
             text = a.get_text(strip=True).lower()
             if 'contact' in text:
                 href = a['href']
@@ -561,16 +1076,15 @@ class AdvancedHotelScraper:
                     contact_url = website_url.rstrip('/') + '/' + href
 
                 # Open contact page
-                contact_html = self.get_page_selenium(contact_url)
+                contact_html = self.get_page_selenium(contact_url) if self.use_selenium \
+                    else self.get_page_requests(contact_url)
                 if not contact_html:
                     continue
                 return self.extract_phone_number(contact_html)
         
         # Fallback: try whole page
-        self.random_delay()
         return self.extract_phone_number(soup.get_text())
 
-
 def main():
     print("=== Enhanced Hotel & Motel Scraper ===")
     print("This scraper extracts: Name, Rating, Price, Contact Info, Website, URL")
@@ -585,7 +1099,7 @@ def main():
     country = input("Enter country name: ").strip()
     
     # Rating filter
-    rating_input = input("Enter minimum rating (optional): ").strip()
+    rating_input = input("Enter minimum Booking.com rating, 1-10 (optional): ").strip()
     min_rating = None
     if rating_input:
         try:
@@ -601,7 +1115,6 @@ def main():
     
     # Initialize scraper
     scraper = AdvancedHotelScraper(use_selenium=use_selenium)
-    scraper.load_proxies()
     
     try:
         print(f"\nScraping hotels in {city}, {country}...")
@@ -636,7 +1149,7 @@ def main():
                     print(f"   URL: {hotel['url']}")
             
             # Save data
-            save_format = input("\nSave data? (csv/json/both/no): ").strip().lower()
+            save_format = input("\nSave data? (csv/json/ndjson/both/no): ").strip().lower()
             
             if save_format in ['csv', 'both']:
                 filename = f"hotels_{city}_{country}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -647,6 +1160,11 @@ def main():
                 filename = f"hotels_{city}_{country}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
                 filename = filename.replace(' ', '_')
                 scraper.save_to_json(unique_hotels, filename)
+            
+            if save_format == 'ndjson':
+                filename = f"hotels_{city}_{country}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+                filename = filename.replace(' ', '_')
+                scraper.save_to_ndjson(unique_hotels, filename)
         
         else:
             print("No hotels found. Try different search terms or check your internet connection.")
@@ -0,0 +1,119 @@
+import atexit
+import json
+import os
+import threading
+
+
+class SelectorPlanner:
+    """Learns which selector matches a field per source/layout and tries it first next time.
+
+    selectors is a priority list whose items are a selector or a tuple of
+    interchangeable alternatives. Only alternatives are reordered by past
+    wins, so a catch-all listed after them never jumps ahead of a specific
+    selector that matches.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._stats = {}  # key -> {'lookups', 'hits', 'first_hits', 'queries', 'wins': {selector: n}}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def pick(self, source, layout, field, selectors, probe):
+        """Return the first non-None probe(selector), trying past winners first"""
+        return self.pick_with_selector(source, layout, field, selectors, probe)[1]
+
+    def pick_with_selector(self, source, layout, field, selectors, probe):
+        """Like pick, but returns (winning selector, value), selector is None on a miss"""
+        key = f"{source}|{layout}|{field}"
+        order = self.plan(key, selectors)
+
+        queries = 0
+        winner = None
+        value = None
+        for selector in order:
+            queries += 1
+            value = probe(selector)
+            if value is not None:
+                winner = selector
+                break
+
+        with self._lock:
+            stats = self._stats.setdefault(key, self._new_stats())
+            stats['lookups'] += 1
+            stats['queries'] += queries
+            if winner is not None:
+                stats['hits'] += 1
+                stats['first_hits'] += queries == 1
+                stats['wins'][winner] = stats['wins'].get(winner, 0) + 1
+        return winner, value
+
+    def plan(self, key, selectors):
+        """Flat selector order: tiers as declared, alternatives within a tier by past wins"""
+        with self._lock:
+            wins = dict(self._stats.get(key, {}).get('wins', {}))
+        order = []
+        for tier in selectors:
+            if isinstance(tier, str):
+                order.append(tier)
+            else:
+                order.extend(sorted(tier, key=lambda selector: -wins.get(selector, 0)))
+        return order
+
+    def report(self):
+        """Per-field hit rates and average selector queries per lookup"""
+        with self._lock:
+            items = sorted(self._stats.items())
+        report = {}
+        for key, stats in items:
+            lookups = stats['lookups'] or 1
+            wins = stats['wins']
+            report[key] = {
+                'lookups': stats['lookups'],
+                'hit_rate': round(stats['hits'] / lookups, 3),
+                'first_try_hit_rate': round(stats['first_hits'] / lookups, 3),
+                'queries_per_lookup': round(stats['queries'] / lookups, 2),
+                'best_selector': max(wins, key=wins.get) if wins else None
+            }
+        return report
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._stats = stats
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._stats)
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save selector stats: {e}")
+
+    @staticmethod
+    def _new_stats():
+        return {'lookups': 0, 'hits': 0, 'first_hits': 0, 'queries': 0, 'wins': {}}
+
+
+_planner = None
+_planner_lock = threading.Lock()
+
+
+def get_selector_planner():
+    """Process-wide planner persisted to SELECTOR_STATS_PATH"""
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = SelectorPlanner(os.environ.get('SELECTOR_STATS_PATH', '.selector_stats.json'))
+            atexit.register(_planner.save)
+        return _planner
@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from dedupe import website_domain
+from lookup_cache import MISSING, lookup_key
+
+
+class LookupFailed(Exception):
+    """A lookup that could not be answered (page failed, captcha), as opposed to one that found nothing"""
+
+
+def site_key(url):
+    """Cache key of a hotel website: its domain plus path, so chain property pages stay apart"""
+    domain = website_domain(url)
+    if not domain:
+        return ''
+    path = urlsplit(url if '//' in url else f'//{url}').path.rstrip('/')
+    return domain + path
+
+
+class WebsiteResolver:
+    """Official websites and their phones from Google, cached, deduplicated and run on a small pool.
+
+    search(name, city, country) and site_phone(url) raise LookupFailed when
+    they got no usable answer, so a failure is retried later instead of
+    being cached as "nothing found".
+    """
+
+    def __init__(self, search, site_phone=None, cache=None, workers=2):
+        self.search = search
+        self.site_phone = site_phone
+        self.cache = cache
+        self.workers = max(1, workers)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, name, city, country):
+        """Future for name's website, shared with any lookup of the same hotel already running"""
+        key = lookup_key(name, city, country)
+        return self._submit('website', key, self.search, name, city, country)
+
+    def resolve(self, name, city, country):
+        return self.submit(name, city, country).result()
+
+    def resolve_many(self, hotels):
+        """Websites for a list of hotel dicts (name, city, country), looked up concurrently, in order"""
+        futures = [self.submit(hotel.get('name'), hotel.get('city'), hotel.get('country')) for hotel in hotels]
+        return [future.result() for future in futures]
+
+    def submit_phone(self, website):
+        """Future for the phone on a website's own pages"""
+        key = site_key(website)
+        if not key or not self.site_phone:
+            return _done(None)
+        return self._submit('site_phone', key, self.site_phone, website)
+
+    def phones_for(self, websites):
+        futures = [self.submit_phone(website) for website in websites]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, kind, key, fn, *args):
+        if self.cache:
+            cached = self.cache.get(kind, key)
+            if cached is not MISSING:
+                return _done(cached)
+
+        with self._lock:
+            future = self._pending.get((kind, key))
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='resolver')
+                future = self._executor.submit(self._run, kind, key, fn, *args)
+                self._pending[(kind, key)] = future
+        return future
+
+    def _run(self, kind, key, fn, *args):
+        try:
+            value = fn(*args)
+        except LookupFailed as e:
+            print(f"{kind} lookup for {key} failed: {e}")
+            return None
+        else:
+            if self.cache:
+                self.cache.put(kind, key, value)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop((kind, key), None)
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future